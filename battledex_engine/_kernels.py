@@ -0,0 +1,199 @@
+"""
+battledex_engine/_kernels.py
+
+Tight numeric loops for the Tetris engine's hot path (collision tests,
+hard-drop descent and stamping a locked piece), written against the engine's bit-packed rows (bit x of
+rows[y] set iff cell (x, y) is occupied) and the packed int8 block table
+tetromino.ALL_SHAPES, addressed by shape index and rotation.
+
+When numba is installed (the "jit" extra) these are compiled to native code
+with @njit. As plain Python the same loops would pay for a NumPy scalar read per
+block and lose to the vectorized code they replaced, so without numba the
+versions at the bottom stand in: they keep each piece as per-row Python int
+bitmasks and test or write a whole board row per piece row.
+"""
+
+import sys
+import numpy as np
+from .state import GRID_WIDTH
+from .tetromino import ALL_SHAPES
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True, boundscheck=False)
+def collides(rows, all_shapes, sid, rot, x, y):
+    """Returns True if piece (sid, rot) at (x, y) hits a wall, the floor or a locked cell."""
+    height = rows.shape[0]
+    for i in range(all_shapes.shape[2]):
+        bx = int(all_shapes[sid, rot, i, 0]) + x
+        by = int(all_shapes[sid, rot, i, 1]) + y
+        if bx < 0 or bx >= GRID_WIDTH or by >= height:
+            return True
+        # Rows above the grid (buffer spawn space) are always free
+        if by >= 0 and (rows[by] >> bx) & 1:
+            return True
+    return False
+
+
+@njit(cache=True, boundscheck=False)
+def drop_distance(rows, all_shapes, sid, rot, x, y):
+    """Returns how many rows piece (sid, rot) can fall from (x, y) before colliding."""
+    dy = 0
+    while not collides(rows, all_shapes, sid, rot, x, y + dy + 1):
+        dy += 1
+    return dy
+
+
+@njit(cache=True, boundscheck=False)
+def stamp_piece(grid, rows, col_heights, all_shapes, sid, rot, x, y, cell):
+    """
+    Writes piece (sid, rot) at (x, y) into the grid, its bit rows and column
+    heights in one pass. Returns (top, bottom, clipped): the highest and lowest
+    rows written (height and -1 if none) and whether any block lay above row 0.
+    """
+    height = rows.shape[0]
+    top = height
+    bottom = -1
+    clipped = False
+    for i in range(all_shapes.shape[2]):
+        bx = int(all_shapes[sid, rot, i, 0]) + x
+        by = int(all_shapes[sid, rot, i, 1]) + y
+        if by < 0:
+            clipped = True
+            continue
+        if by >= height:
+            continue
+        grid[by, bx] = cell
+        rows[by] |= 1 << bx
+        if by < col_heights[bx]:
+            col_heights[bx] = by
+        if by < top:
+            top = by
+        if by > bottom:
+            bottom = by
+    return top, bottom, clipped
+
+
+if HAVE_NUMBA:
+    # Compile once at import so the first hard drop doesn't pay for the JIT
+    _rows = np.zeros(2, dtype=np.uint16)
+    _shapes = np.zeros((1, 1, 1, 2), dtype=np.int8)
+    drop_distance(_rows, _shapes, 0, 0, 0, 0)
+    stamp_piece(np.zeros((2, 1), dtype=np.uint8), _rows, np.zeros(1, dtype=np.int16), _shapes, 0, 0, 0, 0, 1)
+    del _rows, _shapes
+else:
+    def _piece_table(all_shapes):
+        """
+        Returns, per (sid, rot), the piece as (min_x, max_x, min_y, masks, lanes,
+        col_tops), all Python ints: its row bitmasks from its top row down (bit 0
+        = column min_x), the same masks packed 16 bits apiece into one int laid
+        out like the uint16 rows they cover, and the offset of each of its
+        columns' top cell from its top row.
+        """
+        table = []
+        for rots in all_shapes.tolist():
+            entries = []
+            for blocks in rots:
+                min_x = min(bx for bx, _ in blocks)
+                max_x = max(bx for bx, _ in blocks)
+                min_y = min(by for _, by in blocks)
+                masks = [0] * (max(by for _, by in blocks) - min_y + 1)
+                for bx, by in blocks:
+                    masks[by - min_y] |= 1 << (bx - min_x)
+                col_tops = tuple(min(by for bx, by in blocks if bx == c) - min_y for c in range(min_x, max_x + 1))
+                lanes = sum(mask << (16 * i) for i, mask in enumerate(masks))
+                entries.append((min_x, max_x, min_y, tuple(masks), lanes, col_tops))
+            table.append(entries)
+        return table
+
+    _BYTE_ORDER = sys.byteorder
+    # The engine only ever passes tetromino.ALL_SHAPES; its table is built once here
+    _SHAPES = ALL_SHAPES
+    _TABLE = _piece_table(ALL_SHAPES)
+
+    def collides(rows, all_shapes, sid, rot, x, y):
+        """Returns True if piece (sid, rot) at (x, y) hits a wall, the floor or a locked cell."""
+        min_x, max_x, min_y, masks, lanes, _ = (_TABLE if all_shapes is _SHAPES else _piece_table(all_shapes))[sid][rot]
+        if x + min_x < 0 or x + max_x >= GRID_WIDTH:
+            return True
+        top = y + min_y
+        end = top + len(masks)
+        if end > rows.shape[0]:
+            return True
+        # Rows above the grid (buffer spawn space) are always free
+        if top < 0:
+            if end <= 0:
+                return False
+            lanes >>= 16 * -top
+            top = 0
+        # Test every row the piece spans with one AND against the rows' raw bytes
+        return int.from_bytes(rows[top:end].tobytes(), _BYTE_ORDER) & (lanes << (x + min_x)) != 0
+
+    def drop_distance(rows, all_shapes, sid, rot, x, y):
+        """Returns how many rows piece (sid, rot) can fall from (x, y) before colliding."""
+        min_x, max_x, min_y, masks = (_TABLE if all_shapes is _SHAPES else _piece_table(all_shapes))[sid][rot][:4]
+        if x + min_x < 0 or x + max_x >= GRID_WIDTH:
+            return 0
+        shift = x + min_x
+        masks = [mask << shift for mask in masks]
+        board = rows.tolist()
+        # Step the piece's top row down until the next step would hit the floor or a cell
+        top = y + min_y
+        last = len(board) - len(masks)
+        dy = 0
+        while top + dy < last:
+            for by, mask in enumerate(masks, top + dy + 1):
+                if by >= 0 and mask & board[by]:
+                    return dy
+            dy += 1
+        return dy
+
+    def stamp_piece(grid, rows, col_heights, all_shapes, sid, rot, x, y, cell):
+        """
+        Writes piece (sid, rot) at (x, y) into the grid, its bit rows (one OR per
+        piece row) and column heights. Returns (top, bottom, clipped): the
+        highest and lowest rows written (height and -1 if none) and whether any
+        block lay above row 0.
+        """
+        min_x, max_x, min_y, masks, _, col_tops = (_TABLE if all_shapes is _SHAPES else _piece_table(all_shapes))[sid][rot]
+        height = rows.shape[0]
+        top = y + min_y
+        shift = x + min_x
+        first = height
+        last = -1
+        row = rows.item
+        for by, mask in enumerate(masks, top):
+            if by < 0 or by >= height:
+                continue
+            rows[by] = row(by) | (mask << shift)
+            if by < first:
+                first = by
+            last = by
+            bx = shift
+            while mask:
+                if mask & 1:
+                    grid[by, bx] = cell
+                mask >>= 1
+                bx += 1
+        col = col_heights.item
+        for bx, offset in enumerate(col_tops, shift):
+            by = top + offset
+            if by < 0:
+                # The column's top cell is above the grid; columns are contiguous,
+                # so if any of it landed, row 0 now holds it
+                if (row(0) >> bx) & 1:
+                    col_heights[bx] = 0
+            elif by < col(bx):
+                col_heights[bx] = by
+        return first, last, top < 0
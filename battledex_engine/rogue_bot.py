@@ -26,7 +26,8 @@ class RogueBot:
             if len(args) < 2: return True
             x, y = int(args[0]), int(args[1])
             if x < 0 or x >= 10 or y < 0 or y >= 40: return True
-            return self.engine.state.grid[y][x] != 0
+            # bool() so RogueScript sees a real True/False, not a NumPy bool
+            return bool(self.engine.state.grid[y][x] != 0)
         
         self.vm._define_native("is_occupied", is_occupied)
 
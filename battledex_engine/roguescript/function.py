@@ -27,3 +27,27 @@ class NativeFunction:
     def __repr__(self):
         return f"<native fn {self.name}>"
 
+
+def to_marshal(function: RogueScriptFunction) -> tuple:
+    """
+    Flattens a compiled function into nested tuples of primitives so it can
+    be written with the marshal module. Nested functions in the constant
+    pool become tuples too (RogueScript has no tuple values of its own).
+    """
+    chunk = function.chunk
+    constants = tuple(
+        to_marshal(c) if isinstance(c, RogueScriptFunction) else c
+        for c in chunk.constants
+    )
+    return (function.name, function.arity, chunk.name, bytes(chunk.code), constants, tuple(chunk.lines))
+
+def from_marshal(data: tuple) -> RogueScriptFunction:
+    """Rebuilds a RogueScriptFunction from the output of to_marshal."""
+    name, arity, chunk_name, code, constants, lines = data
+    chunk = Chunk(
+        name=chunk_name,
+        code=bytearray(code),
+        constants=[from_marshal(c) if isinstance(c, tuple) else c for c in constants],
+        lines=list(lines),
+    )
+    return RogueScriptFunction(name, arity, chunk)
@@ -55,6 +55,14 @@ class Parser:
         self.tokens = tokens
         self.current = 0
         self.had_error = False
+        # Hot enum members cached as instance attributes so the per-token
+        # predicates avoid a global lookup + attribute access on every call.
+        self._EOF = TokenType.EOF
+        self._SYNC = frozenset((
+            TokenType.DEF, TokenType.VAR, TokenType.IF,
+            TokenType.WHILE, TokenType.PRINT, TokenType.RETURN,
+            TokenType.FOR, TokenType.LBRACE
+        ))
 
     def parse(self) -> ast.Program | None:
         """Main entry point. Parses the entire program."""
@@ -386,7 +394,7 @@ class Parser:
         return self._previous()
 
     def _is_at_end(self) -> bool:
-        return self.tokens[self.current].type == TokenType.EOF
+        return self.tokens[self.current].type == self._EOF
 
     def _peek(self) -> Token:
         """Returns the current token without consuming."""
@@ -417,11 +425,7 @@ class Parser:
                 return
             
             # Look for tokens that likely start a new statement
-            if self._peek().type in (
-                TokenType.DEF, TokenType.VAR, TokenType.IF, 
-                TokenType.WHILE, TokenType.PRINT, TokenType.RETURN,
-                TokenType.FOR, TokenType.LBRACE
-            ):
+            if self._peek().type in self._SYNC:
                 return
                 
             self._advance()
@@ -5,8 +5,10 @@ Defines the data structures that hold the complete, serializable state of a
 Rhythm Tetris game.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Deque, List, Optional
+import numpy as np
 from .tetromino import Tetromino
 
 # Grid Dimensions
@@ -15,17 +17,21 @@ GRID_HEIGHT = 20 # Visible height
 BUFFER_HEIGHT = 20 # Invisible height above
 TOTAL_HEIGHT = GRID_HEIGHT + BUFFER_HEIGHT
 
+# Read-only prototype for new grids; copying it is a single contiguous memcpy
+_EMPTY_GRID = np.zeros((TOTAL_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+_EMPTY_GRID.setflags(write=False)
+
 @dataclass
 class GameState:
     """
     The root object representing the entire state of a Tetris game.
     """
-    # The grid is a list of lists. grid[y][x].
-    # 0 = empty, string = color/shape char (e.g. 'I', 'T')
-    grid: List[List[str | int]] = field(default_factory=lambda: [[0] * GRID_WIDTH for _ in range(TOTAL_HEIGHT)])
+    # The grid is a uint8 array indexed grid[y, x] (grid[y][x] also works).
+    # 0 = empty, otherwise the SHAPE_ID of the locked cell (e.g. 'I' -> 1)
+    grid: np.ndarray = field(default_factory=lambda: _EMPTY_GRID.copy())
     
     current_piece: Optional[Tetromino] = None
-    next_queue: List[str] = field(default_factory=list) # List of shape chars
+    next_queue: Deque[str] = field(default_factory=deque) # Queue of shape chars
     hold_piece: Optional[str] = None
     can_hold: bool = True
     
@@ -37,6 +43,10 @@ class GameState:
     
     game_over: bool = False
     
+    # Versus State
+    garbage_queue: int = 0 # Incoming lines waiting to be inserted
+    attack_buffer: int = 0 # Outgoing lines waiting to be sent
+    
     # Rhythm State
     bpm: float = 120.0
     current_beat: float = 0.0
@@ -1,111 +1,213 @@
-import random
 import time
+from collections import deque
+import numpy as np
 from typing import List, Tuple, Optional, Dict, Any
 from .state import GameState, GRID_WIDTH, TOTAL_HEIGHT, BUFFER_HEIGHT
-from .tetromino import Tetromino, SHAPES, WALL_KICKS_JLSTZ, WALL_KICKS_I
+from .tetromino import Tetromino, SHAPES, SHAPE_ID, SHAPE_BOUNDS, ALL_SHAPES, SHAPE_COLUMN_BOTTOMS, WALL_KICKS_JLSTZ, WALL_KICKS_I, NO_KICKS
+from ._kernels import collides, drop_distance, stamp_piece
+
+# Bit pattern of a completely filled row
+FULL_ROW = (1 << GRID_WIDTH) - 1
+_COLUMN_BITS = (1 << np.arange(GRID_WIDTH)).astype(np.uint16)
+
+# Shape letters in bag index order, and how many 7-bags to shuffle per refill
+_BAG_SHAPES = tuple(SHAPES)
+_BAGS_PER_REFILL = 16
 
 class TetrisEngine:
     def __init__(self, bpm: float = 120.0, seed: Optional[int] = None):
         self.state = GameState()
-        self.state.bpm = bpm
-        self.random = random.Random(seed) if seed is not None else random.Random()
-        self.bag = []
+        self.bpm = bpm
+        # Independent streams for the piece bag and garbage holes, so garbage
+        # received at different times never shifts the seeded piece order
+        bag_seq, garbage_seq = np.random.SeedSequence(seed).spawn(2)
+        self._bag_rng = np.random.default_rng(bag_seq)
+        self._rng = np.random.default_rng(garbage_seq)
+        self._bag_ids = np.tile(np.arange(len(_BAG_SHAPES), dtype=np.int8), (_BAGS_PER_REFILL, 1))
+        self.bag = deque()
         self._fill_bag()
         
+        # Bit x of row_bits[y] is set iff grid cell (x, y) is occupied
+        self.row_bits = np.zeros(TOTAL_HEIGHT, dtype=np.uint16)
+        # Bit y is set iff row y of the grid has any locked cell
+        self._occupied_row_mask = 0
+        # y of the highest occupied cell per column (TOTAL_HEIGHT if empty)
+        self.col_heights = np.full(GRID_WIDTH, TOTAL_HEIGHT, dtype=np.int16)
+        # Grid contents the indexes above were built from. Entry points compare
+        # it with state.grid and rebuild them if the grid was written from
+        # outside the engine.
+        self._board_bytes = self.state.grid.tobytes()
+        
         # Timing
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.last_drop_time = self.start_time
+        # Clock sample shared by everything between begin_frame() and end_frame()
+        self._frame_now: Optional[float] = None
+        self._frame_beat: Optional[float] = None
+
+        # True while a piece is in play and the game isn't over. Refreshed by
+        # spawn_piece, which runs after every lock and so sees every game over
+        self._active = False
         
         # Gravity (Seconds per row)
         # Level 1: 0.8s, Level 10: ~0.15s
         self.gravity_delay = 0.8 
         
         # Rhythm Window (seconds)
-        self.beat_window = 0.1 
+        self.beat_window = 0.1
+
+        # Action dispatch table: name -> (handler(multiplier, now), result on success).
+        # Hard drop and hold always count as performed.
+        self._actions = {
+            'move_left': (lambda m, now: self.move(-1, 0, now), 'moved'),
+            'move_right': (lambda m, now: self.move(1, 0, now), 'moved'),
+            'move_down': (lambda m, now: self.move(0, 1, now), 'moved'),
+            'rotate_cw': (lambda m, now: self.rotate(True), 'rotated'),
+            'rotate_ccw': (lambda m, now: self.rotate(False), 'rotated'),
+            'hard_drop': (lambda m, now: self.hard_drop(m, now) or True, 'dropped'),
+            'hold': (lambda m, now: self.hold(now) or True, 'hold'),
+        }
         
         self.spawn_piece()
 
+    @property
+    def bpm(self) -> float:
+        return self.state.bpm
+
+    @bpm.setter
+    def bpm(self, value: float):
+        # Cache the beat period in integer microseconds for is_on_beat, and
+        # the inverse beat length so the beat position is a multiply
+        self.state.bpm = value
+        self._beat_period_us = int(round(60_000_000 / value))
+        self._inv_beat_duration = value / 60.0
+
+    @property
+    def beat_window(self) -> float:
+        return self._window_us * 1e-6
+
+    @beat_window.setter
+    def beat_window(self, value: float):
+        self._window_us = int(value * 1_000_000)
+
     def _fill_bag(self):
-        new_bag = list(SHAPES.keys())
-        self.random.shuffle(new_bag)
-        self.bag.extend(new_bag)
+        # Shuffle a batch of 7-bags in one call; each row stays a full permutation
+        ids = self._bag_rng.permuted(self._bag_ids, axis=1).ravel()
+        self.bag.extend(map(_BAG_SHAPES.__getitem__, ids.tolist()))
 
-    def spawn_piece(self):
-        if len(self.bag) < 7:
+    def spawn_piece(self, now: Optional[float] = None):
+        # Top the preview back up to 6 in one go; a single refill covers it
+        queue = self.state.next_queue
+        needed = 6 - len(queue)
+        if len(self.bag) < needed + 7:
             self._fill_bag()
-        
-        while len(self.state.next_queue) <= 5:
-            self.state.next_queue.append(self.bag.pop(0))
-            if len(self.bag) < 7:
-                self._fill_bag()
+        popleft = self.bag.popleft
+        queue.extend(popleft() for _ in range(needed))
 
-        shape = self.state.next_queue.pop(0)
+        shape = queue.popleft()
+        self._sync_board()
         # Spawn visible just above board (Row 18, Visible starts at 20)
         spawn_y = BUFFER_HEIGHT - 2
         
         self.state.current_piece = Tetromino(shape=shape, y=spawn_y)
-        self.last_drop_time = time.time()
+        self.last_drop_time = time.monotonic() if now is None else now
         
         if self._check_collision(self.state.current_piece):
             self.state.game_over = True
 
         self.state.can_hold = True
+        self._active = not self.state.game_over
+
+    def refresh_board(self):
+        """Rebuilds the derived board indexes (row_bits, _occupied_row_mask, col_heights) from state.grid."""
+        self.row_bits[:] = (self.state.grid != 0).astype(np.uint16) @ _COLUMN_BITS
+        self._rebuild_row_mask()
+        self._rebuild_col_heights()
+        self._board_bytes = self.state.grid.tobytes()
+
+    def _sync_board(self):
+        """Refreshes the board indexes if state.grid changed since they were built."""
+        if self.state.grid.tobytes() != self._board_bytes:
+            self.refresh_board()
+
+    def _rebuild_col_heights(self):
+        occupied = self.state.grid != 0
+        self.col_heights[:] = np.where(occupied.any(axis=0), occupied.argmax(axis=0), TOTAL_HEIGHT)
+
+    def _rebuild_row_mask(self):
+        mask = 0
+        for y in np.flatnonzero(self.row_bits):
+            mask |= 1 << int(y)
+        self._occupied_row_mask = mask
 
     def _check_collision(self, piece: Tetromino) -> bool:
-        for x, y in piece.get_blocks():
-            if x < 0 or x >= GRID_WIDTH:
-                return True
-            if y >= TOTAL_HEIGHT:
-                return True
-            # Allow existing in buffer (y < 20)
-            # Collision if occupied
-            if y >= 0 and self.state.grid[y][x] != 0:
-                return True
-        return False
+        min_x, max_x, min_y, max_y = SHAPE_BOUNDS[piece.shape][piece.rotation]
+        x, y = piece.x, piece.y
+        if x + min_x >= 0 and x + max_x < GRID_WIDTH and y + max_y < TOTAL_HEIGHT:
+            # Piece is inside the walls; if none of the rows its box spans hold
+            # a locked cell it cannot collide (rows above the grid are free)
+            top = y + min_y
+            span = (1 << (max_y - min_y + 1)) - 1
+            rows = self._occupied_row_mask >> top if top >= 0 else self._occupied_row_mask << -top
+            if rows & span == 0:
+                return False
+        return collides(self.row_bits, ALL_SHAPES, piece.shape_id, piece.rotation, piece.x, piece.y)
 
-    def is_on_beat(self) -> Tuple[bool, float]:
+    def begin_frame(self, now: Optional[float] = None) -> float:
+        """
+        Samples the clock once for a frame. Until end_frame() is called, update(),
+        is_on_beat() and submit_action() reuse this timestamp and beat.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._frame_now = now
+        self._frame_beat = (now - self.start_time) * self._inv_beat_duration
+        self.state.current_beat = self._frame_beat
+        return now
+
+    def end_frame(self):
+        """Drops the cached frame clock so later calls sample time again."""
+        self._frame_now = None
+        self._frame_beat = None
+
+    def is_on_beat(self, now: Optional[float] = None) -> Tuple[bool, float]:
         """Returns (is_on_beat, offset_from_nearest_beat)."""
-        elapsed = time.time() - self.start_time
-        beat_duration = 60.0 / self.state.bpm
-        current_beat = elapsed / beat_duration
+        if now is None:
+            now = self._frame_now
+            if now is None:
+                now = time.monotonic()
+        period = self._beat_period_us
+        elapsed_us = int((now - self.start_time) * 1_000_000)
         
-        offset = abs(current_beat - round(current_beat)) * beat_duration
-        return (offset <= self.beat_window, offset)
+        # Distance to the nearest beat in whole microseconds
+        off = elapsed_us % period
+        if off * 2 > period:
+            off = period - off
+        return (off <= self._window_us, off * 1e-6)
 
     def submit_action(self, action_type: str, *args) -> str:
         """
         Executes an action. Returns a result string event ('moved', 'rotated', 'dropped', 'none', 'game_over').
         """
-        if self.state.game_over:
+        if not self._active:
             return 'game_over'
 
-        on_beat, offset = self.is_on_beat()
+        entry = self._actions.get(action_type)
+        if entry is None:
+            return 'none'
+        fn, result = entry
+
+        now = self._frame_now
+        if now is None:
+            now = time.monotonic()
+        on_beat, offset = self.is_on_beat(now)
         multiplier = 2.0 if on_beat else 1.0
-        
-        result = 'none'
-        
-        if action_type == 'move_left':
-            if self.move(-1, 0): result = 'moved'
-        elif action_type == 'move_right':
-            if self.move(1, 0): result = 'moved'
-        elif action_type == 'move_down':
-            if self.move(0, 1): result = 'moved'
-        elif action_type == 'rotate_cw':
-            if self.rotate(True): result = 'rotated'
-        elif action_type == 'rotate_ccw':
-            if self.rotate(False): result = 'rotated'
-        elif action_type == 'hard_drop':
-            self.hard_drop(multiplier)
-            result = 'dropped' # Hard drop usually implies lock
-        elif action_type == 'hold':
-            self.hold()
-            result = 'hold'
-            
-        return result
+        return result if fn(multiplier, now) else 'none'
 
-    def move(self, dx: int, dy: int) -> bool:
-        if self.state.game_over or not self.state.current_piece:
+    def move(self, dx: int, dy: int, now: Optional[float] = None) -> bool:
+        if not self._active:
             return False
+        self._sync_board()
 
         piece = self.state.current_piece
         piece.x += dx
@@ -117,12 +219,13 @@ class TetrisEngine:
             return False
             
         if dy > 0:
-             self.last_drop_time = time.time()
+             self.last_drop_time = time.monotonic() if now is None else now
         return True
 
     def rotate(self, clockwise: bool = True) -> bool:
-        if self.state.game_over or not self.state.current_piece:
+        if not self._active:
             return False
+        self._sync_board()
 
         piece = self.state.current_piece
         old_rotation = piece.rotation
@@ -131,15 +234,17 @@ class TetrisEngine:
         kick_key = (old_rotation, new_rotation)
         
         if piece.shape == 'I':
-            kicks = WALL_KICKS_I.get(kick_key, [(0, 0)])
+            kicks = WALL_KICKS_I.get(kick_key, NO_KICKS)
         elif piece.shape == 'O':
-            kicks = [(0, 0)]
+            kicks = NO_KICKS
         else:
-            kicks = WALL_KICKS_JLSTZ.get(kick_key, [(0, 0)])
+            kicks = WALL_KICKS_JLSTZ.get(kick_key, NO_KICKS)
 
         piece.rotation = new_rotation
         
-        for kx, ky in kicks:
+        for i in range(kicks.shape[0]):
+            kx = int(kicks[i, 0])
+            ky = int(kicks[i, 1])
             piece.x += kx
             piece.y -= ky
             if not self._check_collision(piece):
@@ -150,52 +255,73 @@ class TetrisEngine:
         piece.rotation = old_rotation
         return False
 
-    def hard_drop(self, multiplier: float = 1.0):
-        if self.state.game_over or not self.state.current_piece:
+    def hard_drop(self, multiplier: float = 1.0, now: Optional[float] = None):
+        if not self._active:
             return
         
-        dropped_cells = 0
-        while self.move(0, 1):
-            dropped_cells += 1
+        if now is None:
+            now = time.monotonic()
+        self._sync_board()
+        piece = self.state.current_piece
+        # Land the lowest block of each column on that column's top cell
+        cols, bottoms = SHAPE_COLUMN_BOTTOMS[piece.shape][piece.rotation]
+        dropped_cells = int((self.col_heights[cols + piece.x] - bottoms).min()) - piece.y - 1
+        if dropped_cells < 0:
+            # Something overhangs the piece; fall back to stepping down
+            dropped_cells = int(drop_distance(self.row_bits, ALL_SHAPES, piece.shape_id, piece.rotation, piece.x, piece.y))
+        piece.y += dropped_cells
         
         self.state.score += int(dropped_cells * 2 * multiplier)
-        self.lock_piece()
+        self.lock_piece(now)
 
     def add_garbage(self, lines: int):
-        if not hasattr(self.state, 'garbage_queue'):
-            self.state.garbage_queue = 0
         self.state.garbage_queue += lines
 
     def _process_garbage(self):
-        if not hasattr(self.state, 'garbage_queue') or self.state.garbage_queue == 0:
+        if self.state.garbage_queue == 0:
             return
             
-        lines = self.state.garbage_queue
+        # Anything pushed past the top of the buffer is lost anyway
+        lines = min(self.state.garbage_queue, TOTAL_HEIGHT)
         self.state.garbage_queue = 0
+        self._sync_board()
         
-        for _ in range(lines):
-            del self.state.grid[0]
-            hole = self.random.randint(0, GRID_WIDTH - 1)
-            new_row = ['G'] * GRID_WIDTH
-            new_row[hole] = 0
-            self.state.grid.append(new_row)
-
-    def lock_piece(self):
+        # Shift the whole board up in one copy, then write all garbage rows at once
+        grid = self.state.grid
+        rows = self.row_bits
+        grid[:-lines] = grid[lines:]
+        rows[:-lines] = rows[lines:]
+        holes = self._rng.integers(0, GRID_WIDTH, size=lines)
+        grid[-lines:] = SHAPE_ID['G']
+        grid[np.arange(TOTAL_HEIGHT - lines, TOTAL_HEIGHT), holes] = 0
+        rows[-lines:] = FULL_ROW & ~(1 << holes)
+        self._rebuild_col_heights()
+
+        # Every row moved up by `lines`; the new bottom rows are all garbage
+        self._occupied_row_mask = (self._occupied_row_mask >> lines) | (((1 << lines) - 1) << (TOTAL_HEIGHT - lines))
+        self._board_bytes = grid.tobytes()
+
+    def lock_piece(self, now: Optional[float] = None):
         if not self.state.current_piece:
             return
 
-        locked_above_buffer = True
-        
-        for x, y in self.state.current_piece.get_blocks():
-            if 0 <= y < TOTAL_HEIGHT:
-                self.state.grid[y][x] = self.state.current_piece.shape
-                # If ANY block is visible (>= BUFFER_HEIGHT), we are safe from strict top-out
-                if y >= BUFFER_HEIGHT:
-                    locked_above_buffer = False
-            elif y < 0:
-                 self.state.game_over = True
-
-        self._clear_lines()
+        piece = self.state.current_piece
+        self._sync_board()
+        top, bottom, clipped = stamp_piece(
+            self.state.grid, self.row_bits, self.col_heights, ALL_SHAPES,
+            piece.shape_id, piece.rotation, piece.x, piece.y, SHAPE_ID[piece.shape])
+        if clipped:
+            self.state.game_over = True
+        # Tetrominoes are vertically connected, so every row in [top, bottom] got a block
+        if bottom >= 0:
+            self._occupied_row_mask |= ((1 << (bottom - top + 1)) - 1) << top
+        self._board_bytes = self.state.grid.tobytes()
+        # If ANY block is visible (>= BUFFER_HEIGHT), we are safe from strict top-out
+        locked_above_buffer = bottom < BUFFER_HEIGHT
+
+        if now is None:
+            now = time.monotonic()
+        self._clear_lines(now, top, bottom)
         self._process_garbage()
         
         # Strict Game Over: Locked entirely above visible area
@@ -203,21 +329,20 @@ class TetrisEngine:
             self.state.game_over = True
         
         self.state.current_piece = None
-        self.spawn_piece()
+        self.spawn_piece(now)
 
-    def _clear_lines(self):
-        lines_to_clear = []
-        for y in range(TOTAL_HEIGHT):
-            if 0 not in self.state.grid[y]:
-                lines_to_clear.append(y)
-        
-        num_cleared = len(lines_to_clear)
+    def _clear_lines(self, now: Optional[float] = None, top: int = 0, bottom: int = TOTAL_HEIGHT - 1):
+        self._sync_board()
+        # Only rows in [top, bottom] (those the last piece touched) can have filled up
+        end = bottom + 1
+        full_mask = self.row_bits[top:end] == FULL_ROW
+        num_cleared = int(np.count_nonzero(full_mask))
         if num_cleared == 0:
             if self.state.combo > -1:
                 self.state.combo = -1
             return
 
-        on_beat, _ = self.is_on_beat()
+        on_beat, _ = self.is_on_beat(now)
         rhythm_bonus = 1.5 if on_beat else 1.0
         attack_multiplier = 2 if on_beat else 1
 
@@ -233,45 +358,56 @@ class TetrisEngine:
         total_garbage = base_garbage + (1 if on_beat else 0)
         
         if total_garbage > 0:
-            if not hasattr(self.state, 'attack_buffer'):
-                self.state.attack_buffer = 0
             self.state.attack_buffer += total_garbage
 
         self.state.lines_cleared += num_cleared
         self.state.combo += 1
         
-        for row_idx in lines_to_clear:
-            del self.state.grid[row_idx]
-            self.state.grid.insert(0, [0] * GRID_WIDTH)
+        # Rows below `bottom` stay put; compact the surviving rows above them
+        # down and blank the top
+        keep = np.ones(end, dtype=bool)
+        keep[top:] = ~full_mask
+        grid = self.state.grid
+        rows = self.row_bits
+        grid[num_cleared:end] = grid[:end][keep]
+        grid[:num_cleared] = 0
+        rows[num_cleared:end] = rows[:end][keep]
+        rows[:num_cleared] = 0
+        self._rebuild_row_mask()
+        self._rebuild_col_heights()
+        self._board_bytes = grid.tobytes()
 
         if self.state.lines_cleared >= self.state.level * 10:
             self.state.level += 1
 
-    def hold(self):
-        if not self.state.can_hold or self.state.game_over:
+    def hold(self, now: Optional[float] = None):
+        if not self._active or not self.state.can_hold:
             return
         
         current_shape = self.state.current_piece.shape
         
         if self.state.hold_piece is None:
             self.state.hold_piece = current_shape
-            self.spawn_piece() 
+            self.spawn_piece(now)
         else:
             temp = self.state.hold_piece
             self.state.hold_piece = current_shape
             self.state.current_piece = Tetromino(shape=temp, y=BUFFER_HEIGHT - 2)
-            self.last_drop_time = time.time()
+            self.last_drop_time = time.monotonic() if now is None else now
         
         self.state.can_hold = False
 
     def update(self, dt: float = 0):
-        if self.state.game_over or not self.state.current_piece:
+        if not self._active:
             return
 
-        # Update current beat
-        elapsed = time.time() - self.start_time
-        beat_duration = 60.0 / self.state.bpm
-        self.state.current_beat = elapsed / beat_duration
+        # Sample the clock once for the whole tick, unless a frame already did
+        now = self._frame_now
+        if now is None:
+            now = time.monotonic()
+            self.state.current_beat = (now - self.start_time) * self._inv_beat_duration
+        else:
+            self.state.current_beat = self._frame_beat
 
         # Gravity scaling
         # Level 1: 0.8s
@@ -282,8 +418,7 @@ class TetrisEngine:
         speed_level = min(20, self.state.level)
         self.gravity_delay = max(0.05, 0.8 - ((speed_level - 1) * 0.04))
 
-        now = time.time()
         if now - self.last_drop_time > self.gravity_delay:
-            if not self.move(0, 1):
-                self.lock_piece()
+            if not self.move(0, 1, now):
+                self.lock_piece(now)
             self.last_drop_time = now
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Tuple, Dict
+import numpy as np
 
 # Shapes defined as list of (x, y) coordinates relative to a center (0, 0)
 # Standard SRS bounding box usually implies a center.
@@ -64,6 +65,13 @@ COLORS = {
     'G': (100, 100, 100)   # Gray (Garbage)
 }
 
+# Small-int cell codes stored in the playfield grid (0 = empty)
+SHAPE_ID = {'I': 1, 'J': 2, 'L': 3, 'O': 4, 'S': 5, 'T': 6, 'Z': 7, 'G': 8}
+SHAPE_NAMES = {v: k for k, v in SHAPE_ID.items()}
+
+# Colors indexed directly by cell code
+CELL_COLORS = [(0, 0, 0)] + [COLORS[SHAPE_NAMES[i]] for i in range(1, len(SHAPE_ID) + 1)]
+
 # Wall Kicks (JLSTZ)
 # (x, y) offset
 # Test 1 is always (0, 0)
@@ -90,17 +98,69 @@ WALL_KICKS_I = {
     (0, 3): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)]
 }
 
-@dataclass
+@dataclass(slots=True)
 class Tetromino:
     shape: str
     rotation: int = 0 # 0, 1, 2, 3 (0, 90, 180, 270)
     x: int = 3 # Spawn position x
     y: int = -1 # Spawn position y (usually -1 or -2 to spawn above board)
+    shape_id: int = field(init=False, repr=False, compare=False) # Index into ALL_SHAPES
+
+    def __post_init__(self):
+        self.shape_id = SHAPE_IDX[self.shape]
     
     def get_blocks(self) -> List[Tuple[int, int]]:
         """Returns the absolute coordinates of the blocks on the grid."""
         local_coords = SHAPES[self.shape][self.rotation]
         return [(x + self.x, y + self.y) for x, y in local_coords]
 
+    @property
+    def local_blocks(self) -> np.ndarray:
+        """Returns the cached (4, 2) block offsets for the current rotation."""
+        return ALL_SHAPES[self.shape_id, self.rotation]
+
     def get_color(self):
         return COLORS[self.shape]
+
+# Block offsets for every piece packed into one contiguous read-only
+# (shape, rotation, block, xy) int8 array, indexed by SHAPE_IDX
+SHAPE_IDX = {s: i for i, s in enumerate(SHAPES)}
+ALL_SHAPES = np.array([SHAPES[s] for s in SHAPE_IDX], dtype=np.int8)
+ALL_SHAPES.setflags(write=False)
+
+# Per-shape (rotation, block, xy) views into ALL_SHAPES
+SHAPES_NP = {s: ALL_SHAPES[i] for s, i in SHAPE_IDX.items()}
+
+# Local bounding box (min_x, max_x, min_y, max_y) per shape and rotation
+SHAPE_BOUNDS = {
+    s: [(min(x for x, _ in r), max(x for x, _ in r), min(y for _, y in r), max(y for _, y in r)) for r in rots]
+    for s, rots in SHAPES.items()
+}
+
+# Per shape and rotation: (local columns, lowest local y in each column) as
+# int8 arrays, used to drop a piece straight onto the column height map
+SHAPE_COLUMN_BOTTOMS = {}
+for _s, _rots in SHAPES.items():
+    SHAPE_COLUMN_BOTTOMS[_s] = []
+    for _r in _rots:
+        _cols = sorted({x for x, _ in _r})
+        _pair = (np.array(_cols, dtype=np.int8),
+                 np.array([max(y for x, y in _r if x == c) for c in _cols], dtype=np.int8))
+        for _arr in _pair:
+            _arr.setflags(write=False)
+        SHAPE_COLUMN_BOTTOMS[_s].append(_pair)
+
+# Intern each distinct kick sequence once as a read-only (5, 2) int8 array and
+# point every table entry that shares it at the same object
+_UNIQUE_KICKS = {}
+for _kicks in list(WALL_KICKS_JLSTZ.values()) + list(WALL_KICKS_I.values()):
+    _key = tuple(_kicks)
+    if _key not in _UNIQUE_KICKS:
+        _UNIQUE_KICKS[_key] = np.array(_kicks, dtype=np.int8)
+        _UNIQUE_KICKS[_key].setflags(write=False)
+WALL_KICKS_JLSTZ = {k: _UNIQUE_KICKS[tuple(v)] for k, v in WALL_KICKS_JLSTZ.items()}
+WALL_KICKS_I = {k: _UNIQUE_KICKS[tuple(v)] for k, v in WALL_KICKS_I.items()}
+
+# Single (0, 0) test used by O pieces and unknown transitions
+NO_KICKS = np.zeros((1, 2), dtype=np.int8)
+NO_KICKS.setflags(write=False)
@@ -0,0 +1,58 @@
+"""
+picoNet/_fastmath.py
+
+Per-packet sequence arithmetic for the reliability layer: wrap-aware sequence
+comparison and the sliding ACK bitfield update.
+
+When numba is installed these are compiled to native code with @njit;
+otherwise they run unchanged as plain Python.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True)
+def is_sequence_greater(s1, s2):
+    """
+    Compares two sequence numbers, accounting for wrapping.
+    Returns True if s1 is greater than s2.
+    """
+    return ((s1 > s2) and (s1 - s2 <= 32768)) or \
+           ((s1 < s2) and (s2 - s1 > 32768))
+
+
+@njit(cache=True)
+def update_ack_bitfield(remote_seq, ack_bitfield, seq):
+    """
+    Records that `seq` arrived. Returns the new (remote_seq, ack_bitfield),
+    where remote_seq is the newest sequence seen (-1 if none yet) and bit i of
+    the bitfield acknowledges remote_seq - 1 - i.
+    """
+    if remote_seq == -1:
+        return seq, ack_bitfield
+    if is_sequence_greater(seq, remote_seq):
+        diff = (seq - remote_seq) & 0xFFFF
+        if diff <= 16:
+            ack_bitfield = ((ack_bitfield << diff) | (1 << (diff - 1))) & 0xFFFF
+        else:
+            ack_bitfield = 0
+        return seq, ack_bitfield
+    diff = (remote_seq - seq) & 0xFFFF
+    if 0 < diff <= 16:
+        ack_bitfield = (ack_bitfield | (1 << (diff - 1))) & 0xFFFF
+    return remote_seq, ack_bitfield
+
+
+if HAVE_NUMBA:
+    # Compile at import so the first packet doesn't pay for the JIT
+    update_ack_bitfield(0, 0, 1)
@@ -7,39 +7,57 @@ user-facing API for the picoNet library.
 """
 
 import time
-import collections
+import math
+import logging
 from enum import Enum, auto
 from typing import Dict, List, Optional, Tuple, Any
 
 from .socket import PicoSocket
-from .packet import Packet, PacketHeader, pack_packet, unpack_packet, PROTOCOL_ID
+from .packet import Packet, unpack_packet, PROTOCOL_ID, PROTOCOL_MAGIC, HDR_STRUCT, ACK_FIELDS_STRUCT, ACK_FIELDS_OFFSET
 from .serializer import serialize, deserialize
+from ._fastmath import is_sequence_greater, update_ack_bitfield
+
+_log = logging.getLogger(__name__)
 
 # --- Constants for the handshake protocol ---
 HANDSHAKE_CHALLENGE = b'\xDE\xAD\xBE\xEF'
 HANDSHAKE_RESPONSE = b'\xCA\xFE\xBA\xBE'
+HANDSHAKE_SIZE = len(HANDSHAKE_CHALLENGE)
 HANDSHAKE_TIMEOUT = 5.0
 HANDSHAKE_RESEND_INTERVAL = 1.0
 
+# Most datagrams drained from the socket per update() tick
+RECEIVE_BATCH_SIZE = 32
+
+# How many of the latest remote sequence numbers are remembered for dedup
+RECEIVED_WINDOW = 64
+RECEIVED_WINDOW_MASK = (1 << RECEIVED_WINDOW) - 1
+
+# Initial slots in the sent-packet ring buffer (power of two). The ring doubles
+# when a new packet would land on an unacked one, up to one slot per sequence number.
+RING_SIZE = 1024
+RING_MASK = RING_SIZE - 1
+MAX_RING_MASK = 0xFFFF
+
 class ConnectionState(Enum):
     """Represents the different states of the connection."""
     DISCONNECTED = auto()
     CONNECTING = auto()
     CONNECTED = auto()
 
-def is_sequence_greater(s1: int, s2: int) -> bool:
-    """
-    Compares two sequence numbers, accounting for wrapping.
-    Returns True if s1 is greater than s2.
-    """
-    return ((s1 > s2) and (s1 - s2 <= 32768)) or \
-           ((s1 < s2) and (s2 - s1 > 32768))
-
 class Connection:
     """
     Manages a connection to a single remote host, providing a reliable layer
     over the underlying UDP socket.
     """
+    __slots__ = (
+        'remote_address', '_socket', 'state', 'timeout', 'last_receive_time', 'rtt',
+        '_handshake_start_time', '_last_handshake_send_time', '_now',
+        '_sequence_number', '_remote_sequence_number', '_ack_bitfield',
+        '_sent_times', '_sent_data', '_sent_seqs', '_sent_live', '_ring_mask', '_earliest_sent_time',
+        '_received_bitmap', '_received_payloads', '_ack_buf',
+    )
+
     def __init__(self, host: str, port: int, local_port: int = 0):
         """
         Initializes the connection object. Does not establish a connection yet.
@@ -53,12 +71,15 @@ class Connection:
         self._socket = PicoSocket('0.0.0.0', local_port)
 
         # Connection State
+        # All timestamps below are time.monotonic() values, only meaningful as
+        # differences; they are not wall-clock times
         self.state = ConnectionState.DISCONNECTED
         self.timeout = 5.0  # Seconds before considering a connection timed out
         self.last_receive_time = 0.0
         self.rtt = 0.1  # Smoothed Round-Trip Time, starts at 100ms
         self._handshake_start_time = 0.0
         self._last_handshake_send_time = 0.0
+        self._now = 0.0  # Clock sampled at the start of the current update() tick
 
         # Packet Sequencing (Outgoing)
         self._sequence_number = 0
@@ -68,9 +89,23 @@ class Connection:
         self._ack_bitfield = 0
 
         # Reliability Management
-        self._sent_packets: Dict[int, Tuple[float, bytes]] = {}
-        self._received_sequences: collections.deque = collections.deque(maxlen=32)
-        self._received_payloads: collections.deque = collections.deque()
+        # Unacked packets live in parallel ring arrays indexed by seq & _ring_mask;
+        # bit i of _sent_live is set iff slot i holds a packet awaiting its ACK
+        self._sent_times: List[float] = [0.0] * RING_SIZE
+        self._sent_data: List[Optional[bytes]] = [None] * RING_SIZE
+        self._sent_seqs: List[int] = [0] * RING_SIZE
+        self._sent_live = 0
+        self._ring_mask = RING_MASK
+        # Lower bound on the send time of any live packet; nothing can be
+        # due for a resend before this plus the timeout threshold
+        self._earliest_sent_time = math.inf
+        # Bit i is set iff (_remote_sequence_number - i) has been received
+        self._received_bitmap = 0
+        self._received_payloads: List[Any] = []
+
+        # Reusable ACK-only packet: header with sequence 0 and no payload.
+        # Only the ack fields are rewritten per send.
+        self._ack_buf = bytearray(HDR_STRUCT.pack(PROTOCOL_ID, 0, 0, 0))
 
     @property
     def is_connected(self) -> bool:
@@ -86,15 +121,15 @@ class Connection:
         if self.state != ConnectionState.DISCONNECTED:
             return
 
-        print(f"Starting connection handshake with {self.remote_address}...")
+        _log.info("Starting connection handshake with %s...", self.remote_address)
         self.state = ConnectionState.CONNECTING
-        self._handshake_start_time = time.time()
-        self._send_handshake_challenge()
+        self._handshake_start_time = time.monotonic()
+        self._send_handshake_challenge(self._handshake_start_time)
 
-    def _send_handshake_challenge(self):
+    def _send_handshake_challenge(self, now: float):
         """Sends the initial handshake packet."""
         self._socket.send(self.remote_address, HANDSHAKE_CHALLENGE)
-        self._last_handshake_send_time = time.time()
+        self._last_handshake_send_time = now
 
     def send(self, payload: Any):
         """
@@ -105,17 +140,61 @@ class Connection:
             return
 
         ack_to_send = self._remote_sequence_number if self._remote_sequence_number != -1 else 0
-        header = PacketHeader(
-            protocol_id=PROTOCOL_ID,
-            sequence=self._sequence_number,
-            ack=ack_to_send,
-            ack_bitfield=self._ack_bitfield
-        )
-        packet = Packet(header=header, payload=serialize(payload))
-        packed_data = pack_packet(packet)
+        # Pack the header straight from the fields, without a PacketHeader/Packet
+        packed_data = HDR_STRUCT.pack(
+            PROTOCOL_ID, self._sequence_number, ack_to_send, self._ack_bitfield
+        ) + serialize(payload)
         self._socket.send(self.remote_address, packed_data)
-        self._sent_packets[self._sequence_number] = (time.time(), packed_data)
-        self._sequence_number = (self._sequence_number + 1) % 65536
+        slot = self._sequence_number & self._ring_mask
+        if (self._sent_live >> slot) & 1:
+            slot = self._reclaim_slot(slot)
+        now = time.monotonic()
+        self._sent_times[slot] = now
+        if now < self._earliest_sent_time:
+            self._earliest_sent_time = now
+        self._sent_data[slot] = packed_data
+        self._sent_seqs[slot] = self._sequence_number
+        self._sent_live |= 1 << slot
+        self._sequence_number = (self._sequence_number + 1) & 0xFFFF
+
+    def _reclaim_slot(self, slot: int) -> int:
+        """
+        Frees a ring slot for the next sequence number when it still holds an
+        unacked packet, by doubling the ring. Once the ring has a slot per
+        sequence number it can't grow, and the old packet is dropped.
+        """
+        mask = self._ring_mask
+        if mask == MAX_RING_MASK:
+            _log.warning("Too many unacked packets; dropping packet %d from the resend buffer.", self._sent_seqs[slot])
+            return slot
+        mask = mask * 2 + 1
+        size = mask + 1
+        sent_times = [0.0] * size
+        sent_data: List[Optional[bytes]] = [None] * size
+        sent_seqs = [0] * size
+        live = self._sent_live
+        new_live = 0
+        # Live sequence numbers are distinct mod the old size, so they stay distinct mod the new one
+        while live:
+            lsb = live & -live
+            live ^= lsb
+            old = lsb.bit_length() - 1
+            seq = self._sent_seqs[old]
+            new = seq & mask
+            sent_times[new] = self._sent_times[old]
+            sent_data[new] = self._sent_data[old]
+            sent_seqs[new] = seq
+            new_live |= 1 << new
+        self._sent_times = sent_times
+        self._sent_data = sent_data
+        self._sent_seqs = sent_seqs
+        self._sent_live = new_live
+        self._ring_mask = mask
+        _log.debug("Grew the resend buffer to %d slots.", size)
+        slot = self._sequence_number & mask
+        if (new_live >> slot) & 1:
+            return self._reclaim_slot(slot)
+        return slot
 
     def send_ack_only(self):
         """
@@ -128,153 +207,195 @@ class Connection:
         if self._remote_sequence_number == -1:
             return  # Nothing to ACK yet
         
-        # Create a packet with empty payload that only carries ACK information
-        header = PacketHeader(
-            protocol_id=PROTOCOL_ID,
-            sequence=0,  # Special sequence 0 for ACK-only packets
-            ack=self._remote_sequence_number,
-            ack_bitfield=self._ack_bitfield
-        )
-        packet = Packet(header=header, payload=b'')  # Empty payload
-        packed_data = pack_packet(packet)
-        self._socket.send(self.remote_address, packed_data)
+        ACK_FIELDS_STRUCT.pack_into(self._ack_buf, ACK_FIELDS_OFFSET, self._remote_sequence_number, self._ack_bitfield)
+        self._socket.send(self.remote_address, self._ack_buf)
 
     def receive(self) -> List[Any]:
         """
-        Deserializes and returns all pending payloads received from the remote host.
+        Returns all pending payloads received from the remote host.
         """
-        payloads = list(self._received_payloads)
-        self._received_payloads.clear()
+        # Swap in a fresh queue rather than copying and clearing the old one
+        payloads = self._received_payloads
+        self._received_payloads = []
         return payloads
 
     def update(self, dt: float):
         """
         The main update loop for the connection. This must be called regularly.
         """
+        # Sample the clock once; everything below works from this tick's time
+        now = time.monotonic()
+        self._now = now
+
         # Handle state-specific logic for timeouts and resends
         if self.state == ConnectionState.CONNECTING:
-            if time.time() - self._handshake_start_time > HANDSHAKE_TIMEOUT:
-                print("Handshake timed out.")
+            if now - self._handshake_start_time > HANDSHAKE_TIMEOUT:
+                _log.warning("Handshake timed out.")
                 self.state = ConnectionState.DISCONNECTED
                 return
-            if time.time() - self._last_handshake_send_time > HANDSHAKE_RESEND_INTERVAL:
-                self._send_handshake_challenge()
+            if now - self._last_handshake_send_time > HANDSHAKE_RESEND_INTERVAL:
+                self._send_handshake_challenge(now)
         
         if self.state == ConnectionState.CONNECTED:
-            if time.time() - self.last_receive_time > self.timeout:
-                print("Connection timed out.")
+            if now - self.last_receive_time > self.timeout:
+                _log.warning("Connection timed out.")
                 self.state = ConnectionState.DISCONNECTED
                 return
 
         # Receive and process all incoming packets
-        self._receive_packets()
+        self._receive_packets(now)
 
-        # If connected, resend any lost application packets
-        if self.state == ConnectionState.CONNECTED:
-            self._resend_lost_packets()
+        # If connected, resend any lost application packets, skipping the scan
+        # while even the oldest one isn't due yet
+        if self.state == ConnectionState.CONNECTED and self._sent_live and \
+                now - self._earliest_sent_time > max(0.1, self.rtt * 1.5):
+            self._resend_lost_packets(now)
     
-    def _receive_packets(self):
-        """Internal helper to process all data waiting on the socket."""
-        while True:
-            received = self._socket.receive()
-            if received is None:
-                break
-
-            data, address = received
-            
+    def _receive_packets(self, now: float):
+        """Internal helper to process up to one batch of data waiting on the socket."""
+        # Bind everything the loop touches per packet to locals. state and
+        # remote are refreshed whenever a handshake changes them.
+        connected = ConnectionState.CONNECTED
+        unpack = unpack_packet
+        process = self._process_received_packet
+        handshake_handlers = _HANDSHAKE_HANDLERS
+        state = self.state
+        remote = self.remote_address
+        got_data = False
+
+        # Datagrams are views into the socket's reusable arena, valid for this batch only
+        for data, address in self._socket.receive_batch_into(RECEIVE_BATCH_SIZE):
             # --- Handshake Packet Handling ---
-            if data == HANDSHAKE_CHALLENGE:
-                print(f"Received handshake challenge from {address}. Sending response.")
-                if self.state == ConnectionState.DISCONNECTED:
-                    self.remote_address = address
-                    self.state = ConnectionState.CONNECTED
-                    self.last_receive_time = time.time()
-                    self._remote_sequence_number = -1
-                    self._sequence_number = 0
-                self._socket.send(address, HANDSHAKE_RESPONSE)
-                continue
+            # Handshake packets are exactly 4 bytes; application packets never are
+            if len(data) == HANDSHAKE_SIZE:
+                handler = handshake_handlers.get(bytes(data))
+                if handler is not None:
+                    handler(self, address, now)
+                    state = self.state
+                    remote = self.remote_address
+                    continue
 
-            if data == HANDSHAKE_RESPONSE:
-                if self.state == ConnectionState.CONNECTING and address == self.remote_address:
-                    print("Handshake successful. Connection established.")
-                    self.state = ConnectionState.CONNECTED
-                    self.last_receive_time = time.time()
+            # --- Application Packet Handling ---
+            if state != connected or address != remote:
                 continue
 
-            # --- Application Packet Handling ---
-            if self.state != ConnectionState.CONNECTED or address != self.remote_address:
+            # Verify Protocol ID before unpacking anything
+            if data[:4] != PROTOCOL_MAGIC:
                 continue
 
             try:
-                packet = unpack_packet(data)
-                
-                # Verify Protocol ID
-                if packet.header.protocol_id != PROTOCOL_ID:
-                    continue
-
-                self.last_receive_time = time.time()
-                self._process_received_packet(packet)
+                packet = unpack(data)
+                got_data = True
+                process(packet, now)
             except (ValueError, TypeError):
-                print("Received a malformed packet.")
+                _log.warning("Received a malformed packet.")
                 continue
 
-    def _process_received_packet(self, packet: Packet):
+        if got_data:
+            self.last_receive_time = now
+
+    def _on_handshake_challenge(self, address: tuple, now: float):
+        """Accepts a connecting peer (if idle) and answers its challenge."""
+        _log.debug("Received handshake challenge from %s. Sending response.", address)
+        if self.state == ConnectionState.DISCONNECTED:
+            self.remote_address = address
+            self.state = ConnectionState.CONNECTED
+            self.last_receive_time = now
+            self._remote_sequence_number = -1
+            self._received_bitmap = 0
+            self._sequence_number = 0
+        self._socket.send(address, HANDSHAKE_RESPONSE)
+
+    def _on_handshake_response(self, address: tuple, now: float):
+        """Completes our own handshake when the expected peer answers."""
+        if self.state == ConnectionState.CONNECTING and address == self.remote_address:
+            _log.info("Handshake successful. Connection established.")
+            self.state = ConnectionState.CONNECTED
+            self.last_receive_time = now
+
+    def _process_received_packet(self, packet: Packet, now: float):
         """Processes a single, valid, application-level packet."""
         seq = packet.header.sequence
-        self._process_acks(packet.header.ack, packet.header.ack_bitfield)
+        self._process_acks(now, packet.header.ack, packet.header.ack_bitfield)
 
         # Ignore ACK-only packets
         if seq == 0 and len(packet.payload) == 0:
             return
         
-        if seq in self._received_sequences:
-            return
-        
-        self._received_sequences.append(seq)
+        remote = self._remote_sequence_number
+        newer = remote == -1 or is_sequence_greater(seq, remote)
+        if not newer:
+            diff = (remote - seq) & 0xFFFF
+            # Duplicate check; packets older than the window can't be told apart and are let through
+            if diff < RECEIVED_WINDOW and (self._received_bitmap >> diff) & 1:
+                return
+
+        # Decode before any ACK bookkeeping, so a payload that fails to decode
+        # raises with the packet still unacked and the sender resends it
+        message = deserialize(packet.payload) if packet.payload else None
+
+        if remote == -1:
+            self._received_bitmap = 1
+        elif newer:
+            diff = (seq - remote) & 0xFFFF
+            self._received_bitmap = ((self._received_bitmap << diff) | 1) & RECEIVED_WINDOW_MASK
+        elif diff < RECEIVED_WINDOW:
+            self._received_bitmap |= 1 << diff
+
+        self._remote_sequence_number, self._ack_bitfield = update_ack_bitfield(remote, self._ack_bitfield, seq)
+
         if packet.payload:
-            self._received_payloads.append(deserialize(packet.payload))
-
-        if self._remote_sequence_number == -1 or is_sequence_greater(seq, self._remote_sequence_number):
-            if self._remote_sequence_number != -1:
-                diff = (seq - self._remote_sequence_number) % 65536
-                if diff <= 16:
-                    self._ack_bitfield = (self._ack_bitfield << diff) | (1 << (diff - 1))
-                    self._ack_bitfield &= 0xFFFF
-                else:
-                    self._ack_bitfield = 0
-            self._remote_sequence_number = seq
-        else:
-            diff = (self._remote_sequence_number - seq) % 65536
-            if diff <= 16:
-                self._ack_bitfield |= (1 << (diff - 1))
-                self._ack_bitfield &= 0xFFFF
-
-    def _process_acks(self, ack: int, bitfield: int):
+            self._received_payloads.append(message)
+
+    def _process_acks(self, now: float, ack: int, bitfield: int):
         """Removes acknowledged packets from the sent packets buffer."""
-        now = time.time()
-        
-        def handle_ack(seq):
-            if seq in self._sent_packets:
-                sent_time, _ = self._sent_packets[seq]
-                measured_rtt = max(0.001, now - sent_time)
-                self.rtt = self.rtt * 0.9 + measured_rtt * 0.1
-                del self._sent_packets[seq]
-
-        handle_ack(ack)
-        for i in range(16):
-            if (bitfield >> i) & 1:
-                seq_to_ack = (ack - 1 - i) % 65536
-                handle_ack(seq_to_ack)
+        live = self._sent_live
+        if not live:
+            return
+        sent_times = self._sent_times
+        sent_data = self._sent_data
+        sent_seqs = self._sent_seqs
+        ring_mask = self._ring_mask
+        rtt = self.rtt
+
+        # Bit 0 stands for `ack` itself and bit j for ack - j; visit only the
+        # set bits, lowest first
+        pending = (bitfield << 1) | 1
+        while pending:
+            lsb = pending & -pending
+            pending ^= lsb
+            seq = (ack + 1 - lsb.bit_length()) & 0xFFFF
+            slot = seq & ring_mask
+            bit = 1 << slot
+            # The seq check rejects ACKs for an older packet whose slot was reused
+            if live & bit and sent_seqs[slot] == seq:
+                live ^= bit
+                sent_data[slot] = None
+                rtt = rtt * 0.9 + max(0.001, now - sent_times[slot]) * 0.1
+
+        self._sent_live = live
+        self.rtt = rtt
     
-    def _resend_lost_packets(self):
+    def _resend_lost_packets(self, now: float):
         """Iterates through sent packets and resends those that are likely lost."""
         timeout_threshold = max(0.1, self.rtt * 1.5) 
-        now = time.time()
-        for seq, (sent_time, data) in list(self._sent_packets.items()):
-            if now - sent_time > timeout_threshold:
-                print(f"Resending likely lost packet: {seq} (RTT: {self.rtt:.3f}s)")
-                self._socket.send(self.remote_address, data)
-                self._sent_packets[seq] = (now, data)
+        sent_times = self._sent_times
+        sent_data = self._sent_data
+        due = []
+        earliest = math.inf
+        live = self._sent_live
+        while live:
+            lsb = live & -live
+            live ^= lsb
+            slot = lsb.bit_length() - 1
+            if now - sent_times[slot] > timeout_threshold:
+                _log.debug("Resending likely lost packet: %d (RTT: %.3fs)", self._sent_seqs[slot], self.rtt)
+                due.append(sent_data[slot])
+                sent_times[slot] = now
+            if sent_times[slot] < earliest:
+                earliest = sent_times[slot]
+        self._earliest_sent_time = earliest
+        self._socket.send_batch(self.remote_address, due)
 
     def close(self):
         """Closes the underlying socket."""
@@ -284,4 +405,10 @@ class Connection:
     def close(self):
         """Closes the underlying socket."""
         self.state = ConnectionState.DISCONNECTED
-        self._socket.close()
\ No newline at end of file
+        self._socket.close()
+
+# Control packets by their exact bytes; new 4-byte control types go here
+_HANDSHAKE_HANDLERS = {
+    HANDSHAKE_CHALLENGE: Connection._on_handshake_challenge,
+    HANDSHAKE_RESPONSE: Connection._on_handshake_response,
+}
@@ -5,12 +5,28 @@ Provides functions for serializing and deserializing game commands and data
 structures into a compact binary format using MessagePack.
 
 This module acts as a wrapper around the `msgpack` library, ensuring a
-consistent serialization method throughout the project.
+consistent serialization method throughout the project. When msgspec is
+installed its C encoder/decoder is used instead; both speak the same format.
 """
 
 import msgpack
 from typing import Any
 
+try:
+    import msgspec
+    HAVE_MSGSPEC = True
+except ImportError:
+    HAVE_MSGSPEC = False
+
+if HAVE_MSGSPEC:
+    _ENC = msgspec.msgpack.Encoder()
+    _DEC = msgspec.msgpack.Decoder()
+    _DECODE_ERRORS = (msgpack.UnpackException, ValueError, msgspec.DecodeError)
+else:
+    # A Packer keeps its internal buffer between calls, unlike msgpack.packb
+    _PACKER = msgpack.Packer(use_bin_type=True)
+    _DECODE_ERRORS = (msgpack.UnpackException, ValueError)
+
 def serialize(data: Any) -> bytes:
     """
     Serializes a Python object into a byte string using MessagePack.
@@ -21,8 +37,22 @@ def serialize(data: Any) -> bytes:
     Returns:
         A byte string representing the serialized data.
     """
+    if HAVE_MSGSPEC:
+        return _ENC.encode(data)
     # `use_bin_type=True` is the modern and recommended setting.
-    return msgpack.packb(data, use_bin_type=True)
+    return _PACKER.pack(data)
+
+def serialize_into(data: Any, buf: bytearray, offset: int = 0) -> int:
+    """
+    Serializes data into buf starting at offset, discarding whatever followed
+    it, and returns the end offset.
+    """
+    if HAVE_MSGSPEC:
+        _ENC.encode_into(data, buf, offset)
+    else:
+        del buf[offset:]
+        buf += _PACKER.pack(data)
+    return len(buf)
 
 def deserialize(data: bytes) -> Any:
     """
@@ -40,10 +70,12 @@ def deserialize(data: bytes) -> Any:
                                  exception type for any unpacking failure.
     """
     try:
+        if HAVE_MSGSPEC:
+            return _DEC.decode(data)
         # `raw=False` ensures that strings are decoded to Python's str type.
         # `strict_map_key=False` is a safe default.
         return msgpack.unpackb(data, raw=False)
-    except (msgpack.UnpackException, ValueError) as e:
+    except _DECODE_ERRORS as e:
         # Catch potential errors from the msgpack library (like ValueError for
         # incomplete data) and re-raise them as the expected UnpackException
         # to provide a consistent API for our serializer.
@@ -6,22 +6,44 @@ provides utility functions for serializing and deserializing them.
 """
 
 import struct
-from dataclasses import dataclass
+import zlib
+from typing import NamedTuple
 
 # A unique 32-bit integer to identify our game's traffic.
 # This helps quickly discard any unrelated UDP packets that might be
 # received on the listening port. We'll use a simple value for now.
 PROTOCOL_ID = 0x524F4755 # Hex for "ROGU"
+# The protocol ID as it appears in the first bytes of every packet, so
+# receivers can drop foreign datagrams before unpacking anything
+PROTOCOL_MAGIC = struct.pack("!I", PROTOCOL_ID)
 
 # The format string for packing/unpacking the header with the struct module.
 # '!' specifies network byte order (big-endian).
 # 'I' is a 4-byte unsigned int (for protocol_id and sequence).
 # 'H' is a 2-byte unsigned short (for ack and ack_bitfield).
 HEADER_FORMAT = "!IIHH"
-HEADER_SIZE = struct.calcsize(HEADER_FORMAT) # Should be 12 bytes
-
-@dataclass
-class PacketHeader:
+# Compiled once; pack/unpack through it skip re-parsing the format string
+HDR_STRUCT = struct.Struct(HEADER_FORMAT)
+HEADER_SIZE = HDR_STRUCT.size # Should be 12 bytes
+
+# Just the trailing (ack, ack_bitfield) pair of the header, for patching a
+# prebuilt header in place
+ACK_FIELDS_STRUCT = struct.Struct("!HH")
+ACK_FIELDS_OFFSET = HEADER_SIZE - ACK_FIELDS_STRUCT.size
+# Just the sequence number, for stamping it into a shared encoded packet
+SEQUENCE_STRUCT = struct.Struct("!I")
+SEQUENCE_OFFSET = 4
+
+# Length prefix in front of each message of a batched payload
+BATCH_LEN_STRUCT = struct.Struct("!H")
+# Batched packets carry no acks, so the top bit of their ack_bitfield is free
+# to mark a batch whose body is zlib-compressed
+BATCH_COMPRESSED = 0x8000
+# Largest body a compressed batch may inflate to (an uncompressed batch has
+# to fit in one datagram anyway); anything bigger is treated as malformed
+MAX_BATCH = 65535
+
+class PacketHeader(NamedTuple):
     """
     Represents the header for every picoNet packet. (12 bytes total)
 
@@ -33,14 +55,13 @@ class PacketHeader:
     ack: int = 0
     ack_bitfield: int = 0
 
-@dataclass
-class Packet:
+class Packet(NamedTuple):
     """
     Represents a complete picoNet packet, containing both the header
     and the game-specific data payload.
     """
     header: PacketHeader
-    payload: bytes
+    payload: bytes # or a memoryview, for packets from unpack_packet
 
 def pack_packet(packet: Packet) -> bytes:
     """
@@ -52,14 +73,8 @@ def pack_packet(packet: Packet) -> bytes:
     Returns:
         A byte string representing the complete packet.
     """
-    header_bytes = struct.pack(
-        HEADER_FORMAT,
-        packet.header.protocol_id,
-        packet.header.sequence,
-        packet.header.ack,
-        packet.header.ack_bitfield
-    )
-    return header_bytes + packet.payload
+    # The header tuple's field order matches HEADER_FORMAT
+    return HDR_STRUCT.pack(*packet.header) + packet.payload
 
 def unpack_packet(data: bytes) -> Packet:
     """
@@ -69,7 +84,9 @@ def unpack_packet(data: bytes) -> Packet:
         data: The raw byte string received from the network.
 
     Returns:
-        A Packet object representing the received data.
+        A Packet object representing the received data. Its payload is a
+        memoryview into `data` rather than a copy; call bytes() on it to keep
+        it past the lifetime of a reused receive buffer.
 
     Raises:
         ValueError: If the data is smaller than the minimum header size.
@@ -78,15 +95,70 @@ def unpack_packet(data: bytes) -> Packet:
         raise ValueError(f"Received data is too small to be a valid packet. "
                          f"Got {len(data)} bytes, expected at least {HEADER_SIZE}.")
 
-    header_tuple = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
-    header = PacketHeader(
-        protocol_id=header_tuple[0],
-        sequence=header_tuple[1],
-        ack=header_tuple[2],
-        ack_bitfield=header_tuple[3]
-    )
-    payload = data[HEADER_SIZE:]
+    header = PacketHeader._make(HDR_STRUCT.unpack_from(data, 0))
+    return Packet(header, memoryview(data)[HEADER_SIZE:])
+
 
-    return Packet(header=header, payload=payload)
 
+def pack_batch(header: PacketHeader, payloads: list) -> bytes:
+    """
+    Packs several messages behind one header, each prefixed with its length,
+    so they can share a single datagram.
+
+    Args:
+        header: The header to put in front of the batch.
+        payloads: The already-serialized messages, in order.
 
+    Returns:
+        A byte string of the form header || (length, payload)*.
+    """
+    parts = [HDR_STRUCT.pack(*header)]
+    pack_len = BATCH_LEN_STRUCT.pack
+    for payload in payloads:
+        parts.append(pack_len(len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+def unpack_batch(payload: bytes, compressed: bool = False) -> list:
+    """
+    Splits the payload of a batched packet back into its messages.
+
+    Args:
+        payload: The packet payload produced by pack_batch.
+        compressed: Whether the header's BATCH_COMPRESSED flag was set.
+
+    Returns:
+        A list of the message payloads, in order.
+
+    Raises:
+        ValueError: If the payload doesn't decompress, inflates past MAX_BATCH,
+                    or a length prefix or message is truncated.
+    """
+    if compressed:
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(payload, MAX_BATCH)
+        except zlib.error as e:
+            raise ValueError(f"Failed to decompress batched payload: {e}") from e
+        # Input left over means the body inflates past MAX_BATCH
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise ValueError(f"Compressed batched payload is truncated or "
+                             f"inflates past {MAX_BATCH} bytes.")
+        if decompressor.unused_data:
+            raise ValueError("Trailing data after the compressed batched payload.")
+    messages = []
+    offset = 0
+    end = len(payload)
+    prefix_size = BATCH_LEN_STRUCT.size
+    unpack_len = BATCH_LEN_STRUCT.unpack_from
+    while offset < end:
+        if offset + prefix_size > end:
+            raise ValueError("Truncated length prefix in batched payload.")
+        (length,) = unpack_len(payload, offset)
+        offset += prefix_size
+        if offset + length > end:
+            raise ValueError(f"Truncated message in batched payload. "
+                             f"Expected {length} bytes, got {end - offset}.")
+        messages.append(payload[offset:offset + length])
+        offset += length
+    return messages
@@ -11,7 +11,6 @@ unknown keys, making it flexible for other data structures.
 """
 
 import struct
-import io
 
 # --- Type Tags ---
 # A single byte that precedes each piece of data to identify its type.
@@ -23,6 +22,12 @@ TAG_FLOAT64 = 0x04  # 8-byte double-precision float
 TAG_STRING_UTF8 = 0x05
 TAG_LIST = 0x06
 TAG_DICT = 0x07     # A dictionary with our special known keys
+# Narrower and wider ints; each int uses the smallest tag that holds it
+TAG_INT8 = 0x0B     # 1-byte signed integer
+TAG_INT16 = 0x0C    # 2-byte signed integer
+TAG_INT64 = 0x0D    # 8-byte signed integer
+TAG_BYTES = 0x0E    # Raw bytes, 2-byte length prefix (e.g. a packed grid)
+TAG_KNOWN_STRING = 0x0F # A string from the KNOWN_VALUES codebook, next byte is its ID
 
 # --- Key Tags (for expandability) ---
 TAG_KNOWN_KEY = 0x08  # The key is in our codebook, next byte is its ID
@@ -42,63 +47,139 @@ KNOWN_KEYS = {
     'y': 0x08,
     'hex': 0x09,
     'color': 0x0A,
+    # Tetris versus protocol
+    'score': 0x0B,
+    'grid': 0x0C,
+    'lines': 0x0D,
+    'target_id': 0x0E,
+    'sender': 0x0F,
+    'match_seed': 0x10,
+    'server_time': 0x11,
 }
 # Create a reverse mapping for fast deserialization
 KNOWN_KEYS_INV = {v: k for k, v in KNOWN_KEYS.items()}
 
+# String values that repeat in nearly every message (command names) get the
+# same treatment as keys.
+KNOWN_VALUES = {
+    'welcome': 0x01,
+    'garbage': 0x02,
+    'opponent_update': 0x03,
+    'login': 0x04,
+    'update': 0x05,
+    'attack': 0x06,
+}
+KNOWN_VALUES_INV = {v: k for k, v in KNOWN_VALUES.items()}
+
+
+# Precompiled formats. On the write side the tag byte is fused into the
+# fixed-width value formats so each int/float costs a single pack call.
+_STRUCT_H = struct.Struct('>H')
+_STRUCT_b = struct.Struct('>b')
+_STRUCT_h = struct.Struct('>h')
+_STRUCT_i = struct.Struct('>i')
+_STRUCT_q = struct.Struct('>q')
+_STRUCT_d = struct.Struct('>d')
+_STRUCT_Bh = struct.Struct('>Bh')
+_STRUCT_Bi = struct.Struct('>Bi')
+_STRUCT_Bq = struct.Struct('>Bq')
+_STRUCT_Bd = struct.Struct('>Bd')
+
+# Tag + ID pair for every known key, so writing one is a single 2-byte append
+_KNOWN_KEY_PREFIX = {key: bytes((TAG_KNOWN_KEY, key_id)) for key, key_id in KNOWN_KEYS.items()}
+_KNOWN_VALUE_BYTES = {value: bytes((TAG_KNOWN_STRING, value_id)) for value, value_id in KNOWN_VALUES.items()}
 
-def serialize(data: dict) -> bytes:
+
+def serialize(data: dict, buf: bytearray = None) -> bytes:
     """
     Serializes a Python dictionary into our custom compact byte format.
+
+    If `buf` is given the encoding is appended to it in place (and its full
+    contents returned), so callers can reuse one buffer across messages.
+    """
+    if not isinstance(data, dict):
+        raise TypeError("Top-level object for this serializer must be a dictionary.")
+
+    if buf is None:
+        buf = bytearray()
+    _serialize_dict(buf, data)
+    return bytes(buf)
+
+
+def serialize_into(data: dict, buf: bytearray, offset: int = 0) -> int:
+    """
+    Encodes data into buf starting at offset, discarding whatever followed it,
+    and returns the end offset. Lets a sender keep one buffer with a packet
+    header in front and rewrite only the payload behind it.
+
+    buf must not have live memoryview exports, since it may be resized.
     """
     if not isinstance(data, dict):
         raise TypeError("Top-level object for this serializer must be a dictionary.")
 
-    stream = io.BytesIO()
-    stream.write(bytes([TAG_DICT]))
-    stream.write(struct.pack('>H', len(data)))
+    del buf[offset:]
+    _serialize_dict(buf, data)
+    return len(buf)
+
+
+def _serialize_dict(buf: bytearray, data: dict):
+    """Appends a tagged, length-prefixed dictionary to buf."""
+    buf.append(TAG_DICT)
+    buf += _STRUCT_H.pack(len(data))
 
     for key, value in data.items():
-        if key in KNOWN_KEYS:
-            stream.write(bytes([TAG_KNOWN_KEY]))
-            stream.write(bytes([KNOWN_KEYS[key]]))
+        prefix = _KNOWN_KEY_PREFIX.get(key)
+        if prefix is not None:
+            buf += prefix
         else:
-            stream.write(bytes([TAG_UNKNOWN_KEY]))
+            buf.append(TAG_UNKNOWN_KEY)
             encoded_key = key.encode('utf-8')
-            stream.write(struct.pack('>H', len(encoded_key)))
-            stream.write(encoded_key)
+            buf += _STRUCT_H.pack(len(encoded_key))
+            buf += encoded_key
 
-        _serialize_value(stream, value)
+        _serialize_value(buf, value)
 
-    return stream.getvalue()
 
-def _serialize_value(stream, value):
-    """Helper function to recursively serialize a value to the stream."""
+def _serialize_value(buf: bytearray, value):
+    """Helper function to recursively serialize a value into buf."""
     if value is None:
-        stream.write(bytes([TAG_NULL]))
+        buf.append(TAG_NULL)
     elif isinstance(value, bool):
-        stream.write(bytes([TAG_BOOL_TRUE if value else TAG_BOOL_FALSE]))
+        buf.append(TAG_BOOL_TRUE if value else TAG_BOOL_FALSE)
     elif isinstance(value, int):
-        stream.write(bytes([TAG_INT32]))
-        stream.write(struct.pack('>i', value))
+        if -0x80 <= value < 0x80:
+            buf.append(TAG_INT8)
+            buf.append(value & 0xFF)
+        elif -0x8000 <= value < 0x8000:
+            buf += _STRUCT_Bh.pack(TAG_INT16, value)
+        elif -0x80000000 <= value < 0x80000000:
+            buf += _STRUCT_Bi.pack(TAG_INT32, value)
+        else:
+            # Raises struct.error beyond 64 bits
+            buf += _STRUCT_Bq.pack(TAG_INT64, value)
     elif isinstance(value, float):
-        stream.write(bytes([TAG_FLOAT64]))
-        stream.write(struct.pack('>d', value))
+        buf += _STRUCT_Bd.pack(TAG_FLOAT64, value)
     elif isinstance(value, str):
-        stream.write(bytes([TAG_STRING_UTF8]))
+        known = _KNOWN_VALUE_BYTES.get(value)
+        if known is not None:
+            buf += known
+            return
+        buf.append(TAG_STRING_UTF8)
         encoded_str = value.encode('utf-8')
-        stream.write(struct.pack('>H', len(encoded_str)))
-        stream.write(encoded_str)
+        buf += _STRUCT_H.pack(len(encoded_str))
+        buf += encoded_str
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        buf.append(TAG_BYTES)
+        buf += _STRUCT_H.pack(len(value))
+        buf += value
     elif isinstance(value, list):
-        stream.write(bytes([TAG_LIST]))
-        stream.write(struct.pack('>H', len(value)))
+        buf.append(TAG_LIST)
+        buf += _STRUCT_H.pack(len(value))
         for item in value:
-            _serialize_value(stream, item)
+            _serialize_value(buf, item)
     elif isinstance(value, dict):
-        # For nested dictionaries, we call the main serialize logic, which
-        # correctly prefixes the data with a dictionary tag and length.
-        nested_data = serialize(value)
-        stream.write(nested_data)
+        # Nested dictionaries are written in place, with their own tag and length.
+        _serialize_dict(buf, value)
     else:
         raise TypeError(f"Unsupported type for serialization: {type(value)}")
 
@@ -106,77 +187,107 @@ def _serialize_value(stream, value):
 def deserialize(data: bytes) -> dict:
     """
     Deserializes a byte string from our custom format into a Python dictionary.
+    Any buffer works (e.g. a memoryview into a receive buffer); fields are
+    read in place by offset rather than copied out through a stream.
     """
     if not data:
         raise ValueError("Cannot deserialize empty data.")
-        
-    stream = io.BytesIO(data)
-    tag_byte = stream.read(1)
-    if not tag_byte:
-        raise ValueError("Data stream is empty.")
-    
-    tag = tag_byte[0]
+
+    tag = data[0]
     if tag != TAG_DICT:
         raise ValueError(f"Data stream does not start with a dictionary tag (got {tag}).")
-    return _deserialize_dict_from_stream(stream)
+    try:
+        result, _ = _deserialize_dict(data, 1)
+    except (struct.error, IndexError):
+        raise ValueError("Malformed or incomplete data stream.")
+    return result
+
 
+def _deserialize_str(data, offset: int) -> tuple:
+    """Reads a length-prefixed UTF-8 string at offset. Returns (str, offset past it)."""
+    length = _STRUCT_H.unpack_from(data, offset)[0]
+    offset += 2
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Incomplete stream: string runs past the end of the data.")
+    return str(data[offset:end], 'utf-8'), end
 
-def _deserialize_dict_from_stream(stream: io.BytesIO) -> dict:
+
+def _deserialize_dict(data, offset: int) -> tuple:
     """
-    Helper that reads dictionary content from a stream, assuming the TAG_DICT
-    has already been consumed.
+    Helper that reads dictionary content starting at offset, assuming the
+    TAG_DICT has already been consumed. Returns (dict, offset past it).
     """
-    try:
-        num_items = struct.unpack('>H', stream.read(2))[0]
-        result_dict = {}
-        for _ in range(num_items):
-            key_tag = stream.read(1)[0]
-            key = None
-            if key_tag == TAG_KNOWN_KEY:
-                key_id = stream.read(1)[0]
-                key = KNOWN_KEYS_INV.get(key_id)
-                if key is None:
-                    raise ValueError(f"Invalid known key ID '{key_id}' found.")
-            elif key_tag == TAG_UNKNOWN_KEY:
-                key_length = struct.unpack('>H', stream.read(2))[0]
-                key = stream.read(key_length).decode('utf-8')
-            else:
-                raise ValueError(f"Invalid or unknown key tag '{key_tag}' in stream.")
-
-            value = _deserialize_value(stream)
-            result_dict[key] = value
-        return result_dict
-    except (struct.error, IndexError):
-        raise ValueError("Malformed or incomplete data stream.")
+    num_items = _STRUCT_H.unpack_from(data, offset)[0]
+    offset += 2
+    result_dict = {}
+    for _ in range(num_items):
+        key_tag = data[offset]
+        offset += 1
+        if key_tag == TAG_KNOWN_KEY:
+            key_id = data[offset]
+            offset += 1
+            key = KNOWN_KEYS_INV.get(key_id)
+            if key is None:
+                raise ValueError(f"Invalid known key ID '{key_id}' found.")
+        elif key_tag == TAG_UNKNOWN_KEY:
+            key, offset = _deserialize_str(data, offset)
+        else:
+            raise ValueError(f"Invalid or unknown key tag '{key_tag}' in stream.")
 
+        value, offset = _deserialize_value(data, offset)
+        result_dict[key] = value
+    return result_dict, offset
 
-def _deserialize_value(stream):
-    """Helper function to recursively deserialize a value from the stream."""
-    tag_byte = stream.read(1)
-    if not tag_byte:
+
+def _deserialize_value(data, offset: int) -> tuple:
+    """Helper function to recursively deserialize a value. Returns (value, offset past it)."""
+    if offset >= len(data):
         raise ValueError("Incomplete stream: trying to read a value tag.")
-    tag = tag_byte[0]
+    tag = data[offset]
+    offset += 1
 
     if tag == TAG_NULL:
-        return None
+        return None, offset
     if tag == TAG_BOOL_FALSE:
-        return False
+        return False, offset
     if tag == TAG_BOOL_TRUE:
-        return True
+        return True, offset
+    if tag == TAG_INT8:
+        return _STRUCT_b.unpack_from(data, offset)[0], offset + 1
+    if tag == TAG_INT16:
+        return _STRUCT_h.unpack_from(data, offset)[0], offset + 2
     if tag == TAG_INT32:
-        return struct.unpack('>i', stream.read(4))[0]
+        return _STRUCT_i.unpack_from(data, offset)[0], offset + 4
+    if tag == TAG_INT64:
+        return _STRUCT_q.unpack_from(data, offset)[0], offset + 8
     if tag == TAG_FLOAT64:
-        return struct.unpack('>d', stream.read(8))[0]
+        return _STRUCT_d.unpack_from(data, offset)[0], offset + 8
     if tag == TAG_STRING_UTF8:
-        length = struct.unpack('>H', stream.read(2))[0]
-        return stream.read(length).decode('utf-8')
+        return _deserialize_str(data, offset)
+    if tag == TAG_KNOWN_STRING:
+        value_id = data[offset]
+        value = KNOWN_VALUES_INV.get(value_id)
+        if value is None:
+            raise ValueError(f"Invalid known value ID '{value_id}' found.")
+        return value, offset + 1
+    if tag == TAG_BYTES:
+        length = _STRUCT_H.unpack_from(data, offset)[0]
+        offset += 2
+        end = offset + length
+        if end > len(data):
+            raise ValueError("Incomplete stream: bytes run past the end of the data.")
+        return bytes(data[offset:end]), end
     if tag == TAG_LIST:
-        num_items = struct.unpack('>H', stream.read(2))[0]
-        return [_deserialize_value(stream) for _ in range(num_items)]
+        num_items = _STRUCT_H.unpack_from(data, offset)[0]
+        offset += 2
+        items = []
+        for _ in range(num_items):
+            item, offset = _deserialize_value(data, offset)
+            items.append(item)
+        return items, offset
     if tag == TAG_DICT:
-        # A nested dictionary. The TAG_DICT has been read by this point.
-        return _deserialize_dict_from_stream(stream)
+        # A nested dictionary, parsed in place. The TAG_DICT has been read by this point.
+        return _deserialize_dict(data, offset)
 
     raise ValueError(f"Unknown type tag in stream: {tag}")
-
-
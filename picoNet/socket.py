@@ -8,6 +8,14 @@ which is essential for real-time applications like games.
 
 import socket
 
+# Largest datagram we accept, and the size of the reusable receive arena that
+# receive_batch_into() packs datagrams into (room for at least a few maximal ones)
+MAX_DATAGRAM = 65535
+RECV_ARENA_SIZE = 4 * MAX_DATAGRAM
+# Kernel receive buffer we ask for, so bursts between ticks aren't dropped
+# (the OS may clamp it)
+SOCKET_RCVBUF = 2 << 20
+
 class PicoSocket:
     """A non-blocking UDP socket wrapper."""
 
@@ -20,6 +28,8 @@ class PicoSocket:
             port: The port to bind to. Use 0 to let the OS choose a port.
         """
         self.socket = None
+        self._arena = bytearray(RECV_ARENA_SIZE)
+        self._arena_view = memoryview(self._arena)
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             # Set the socket to be non-blocking. This is crucial.
@@ -27,6 +37,7 @@ class PicoSocket:
             # --- FIX: Allow address reuse ---
             # This prevents "Address already in use" errors in rapid testing.
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF)
             self.socket.bind((host, port))
             print(f"PicoSocket bound to {self.socket.getsockname()}")
         except OSError as e:
@@ -47,6 +58,20 @@ class PicoSocket:
             return
         self.socket.sendto(data, address)
 
+    def send_batch(self, address: tuple, datagrams: list[bytes]):
+        """
+        Sends several datagrams to the same address.
+
+        Args:
+            address: A (host, port) tuple for the destination.
+            datagrams: The payloads to send, in order.
+        """
+        if not self.socket or not datagrams:
+            return
+        sendto = self.socket.sendto
+        for data in datagrams:
+            sendto(data, address)
+
     def receive(self) -> tuple[bytes, tuple] | None:
         """
         Receives data from the socket.
@@ -59,12 +84,63 @@ class PicoSocket:
             return None
         try:
             # A large buffer size is fine for UDP.
-            data, address = self.socket.recvfrom(65535)
+            data, address = self.socket.recvfrom(MAX_DATAGRAM)
             return data, address
         except BlockingIOError:
             # This is expected when no data is available on a non-blocking socket.
             return None
 
+    def receive_batch(self, max_n: int = 32) -> list[tuple[bytes, tuple]]:
+        """
+        Receives up to max_n pending datagrams in one call.
+
+        Stops early once the socket has nothing more to read, so the cap only
+        matters under a flood, where it keeps one tick from draining forever.
+
+        Returns:
+            A list of (data, address) tuples, possibly empty.
+        """
+        batch = []
+        if not self.socket:
+            return batch
+        recvfrom = self.socket.recvfrom
+        append = batch.append
+        try:
+            for _ in range(max_n):
+                append(recvfrom(MAX_DATAGRAM))
+        except BlockingIOError:
+            pass
+        return batch
+
+    def receive_batch_into(self, max_n: int = 32) -> list[tuple[memoryview, tuple]]:
+        """
+        Like receive_batch(), but reads the datagrams back to back into a
+        preallocated arena instead of allocating a bytes object per packet.
+
+        The returned memoryviews are only valid until the next call; copy
+        anything that must outlive it.
+
+        Returns:
+            A list of (data, address) tuples, possibly empty.
+        """
+        batch = []
+        if not self.socket:
+            return batch
+        recvfrom_into = self.socket.recvfrom_into
+        view = self._arena_view
+        offset = 0
+        try:
+            for _ in range(max_n):
+                # Stop while a maximal datagram is still guaranteed to fit
+                if RECV_ARENA_SIZE - offset < MAX_DATAGRAM:
+                    break
+                n, address = recvfrom_into(view[offset:], MAX_DATAGRAM)
+                batch.append((view[offset:offset + n], address))
+                offset += n
+        except BlockingIOError:
+            pass
+        return batch
+
     def get_address(self) -> tuple | None:
         """
         --- NEW: Returns the address the socket is bound to. ---
@@ -73,6 +149,15 @@ class PicoSocket:
             return None
         return self.socket.getsockname()
 
+    def fileno(self) -> int:
+        """
+        Returns the underlying file descriptor (-1 if closed), so a PicoSocket
+        can be registered with select/selectors directly.
+        """
+        if not self.socket:
+            return -1
+        return self.socket.fileno()
+
     def close(self):
         """Closes the socket."""
         if self.socket:
@@ -2,65 +2,137 @@ import sys
 import os
 import time
 import random
-from dataclasses import dataclass, field
-from typing import Dict, Tuple, Optional
+import heapq
+import zlib
+import struct
+import selectors
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from picoNet.socket import PicoSocket
-from picoNet.packet import Packet, PacketHeader, PROTOCOL_ID, pack_packet, unpack_packet
+from picoNet.packet import (PacketHeader, PROTOCOL_ID, PROTOCOL_MAGIC, HDR_STRUCT, HEADER_SIZE,
+                            BATCH_LEN_STRUCT, BATCH_COMPRESSED, SEQUENCE_STRUCT, SEQUENCE_OFFSET,
+                            unpack_packet, unpack_batch)
 from picoNet.serializer import serialize, deserialize
 
-@dataclass
+# Queued messages are packed into datagrams of at most this size, to stay
+# under a typical path MTU (a single larger message still goes out alone)
+MAX_DATAGRAM_SIZE = 1200
+
+# Batches with a larger body than this are sent zlib-compressed (grids are
+# mostly empty cells and shrink well); smaller ones aren't worth the CPU
+COMPRESS_THRESHOLD = 256
+
+# The welcome message's server_time, patched into a pre-encoded template
+SERVER_TIME_STRUCT = struct.Struct('>d')
+
+# Players not heard from for this many seconds are dropped
+SESSION_TIMEOUT = 30.0
+# Longest the loop blocks waiting for traffic, so `running` is rechecked
+MAX_IDLE_WAIT = 1.0
+
+@dataclass(slots=True)
 class PlayerSession:
     address: Tuple[str, int]
     player_id: str
-    last_seen: float
+    last_seen: float # time.monotonic()
     score: int = 0
-    grid: list = field(default_factory=list)
+    grid: bytes = b"" # Visible board, one cell per byte; forwarded without decoding
 
 class TetrisServer:
     def __init__(self, port: int = 4242):
         self.socket = PicoSocket("0.0.0.0", port)
         self.players: Dict[str, PlayerSession] = {} # player_id -> Session
         self.address_map: Dict[Tuple[str, int], str] = {} # address -> player_id
+        # player_id -> address, kept alongside players so broadcasts only walk addresses
+        self._broadcast_addrs: Dict[str, Tuple[str, int]] = {}
         self.match_seed = random.randint(0, 999999)
+        # Outgoing packets are encoded here behind a header template; only the
+        # sequence number is rewritten per datagram
+        self._send_buf = bytearray(HDR_STRUCT.pack(*PacketHeader()))
+        self._send_seqs: Dict[Tuple[str, int], int] = {} # address -> last sequence sent
+        # Encoded messages waiting for the end of the tick, per address
+        self._out_queues: Dict[Tuple[str, int], List[bytes]] = {}
+        # One (last_seen, player_id) entry per player, oldest first. Entries
+        # go stale as players are heard from and are refreshed when popped.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # match_seed is fixed for the server's lifetime, so the welcome is
+        # encoded once and only its server_time is rewritten per login. The
+        # float is the last field of the shorter dict, which locates it.
+        self._welcome = bytearray(serialize({
+            "command": "welcome",
+            "server_time": 0.0,
+            "match_seed": self.match_seed
+        }))
+        self._welcome_time_offset = len(serialize({"command": "welcome", "server_time": 0.0})) - SERVER_TIME_STRUCT.size
+        
+        # Block until a datagram arrives instead of polling the socket
+        self._selector = selectors.DefaultSelector()
+        if self.socket.socket:
+            self._selector.register(self.socket.socket, selectors.EVENT_READ)
         
         self.running = True
         print(f"Tetris Server started on port {port}. Match Seed: {self.match_seed}")
 
     def run(self):
         while self.running:
-            self._process_network()
-            # Cleanup stale players (e.g. 30s timeout)
-            now = time.time()
-            stale = [pid for pid, s in self.players.items() if now - s.last_seen > 30]
-            for pid in stale:
-                print(f"Player {pid} timed out.")
-                addr = self.players[pid].address
-                if addr in self.address_map: del self.address_map[addr]
-                del self.players[pid]
-                
-            time.sleep(0.001)
+            # Sleep until traffic arrives or the oldest session could expire
+            heap = self._expiry_heap
+            timeout = MAX_IDLE_WAIT
+            if heap:
+                timeout = min(timeout, max(0.0, heap[0][0] + SESSION_TIMEOUT - time.monotonic()))
+            if self._selector.select(timeout):
+                self._process_network()
+            self._expire_sessions(time.monotonic())
+
+    def _expire_sessions(self, now: float):
+        """Drops players not heard from in SESSION_TIMEOUT seconds."""
+        heap = self._expiry_heap
+        deadline = now - SESSION_TIMEOUT
+        while heap and heap[0][0] < deadline:
+            _, pid = heapq.heappop(heap)
+            session = self.players.get(pid)
+            if session is None:
+                continue
+            if session.last_seen >= deadline:
+                # Heard from since this entry was queued; check again later
+                heapq.heappush(heap, (session.last_seen, pid))
+                continue
+            print(f"Player {pid} timed out.")
+            self.address_map.pop(session.address, None)
+            del self.players[pid]
+            del self._broadcast_addrs[pid]
+            self._send_seqs.pop(session.address, None)
 
     def _process_network(self):
+        receive_batch_into = self.socket.receive_batch_into
         while True:
-            result = self.socket.receive()
-            if not result:
+            # Datagrams land in the socket's reusable arena; each message is
+            # deserialized (copied out) before the next batch overwrites it
+            batch = receive_batch_into()
+            if not batch:
                 break
             
-            data, addr = result
-            try:
-                packet = unpack_packet(data)
-                if packet.header.protocol_id != PROTOCOL_ID:
+            for data, addr in batch:
+                # Drop foreign traffic before unpacking anything
+                if data[:4] != PROTOCOL_MAGIC:
                     continue
-                
-                payload = deserialize(packet.payload)
-                self._handle_message(payload, addr)
-                
-            except Exception as e:
-                pass # Silently ignore malformed
+                try:
+                    packet = unpack_packet(data)
+                    # Clients never compress what they send, so a flagged
+                    # batch is not ours; don't spend memory inflating it
+                    if packet.header.ack_bitfield & BATCH_COMPRESSED:
+                        continue
+                    for payload in unpack_batch(packet.payload):
+                        self._handle_message(deserialize(payload), addr)
+                    
+                except Exception as e:
+                    pass # Silently ignore malformed
+
+        self._flush_outgoing()
 
     def _handle_message(self, message: dict, addr: Tuple[str, int]):
         cmd = message.get("command")
@@ -78,32 +150,34 @@ class TetrisServer:
             
         print(f"Player {player_id} connected from {addr}")
         
+        now = time.monotonic()
         # If player already exists, update address
         if player_id in self.players:
             old_addr = self.players[player_id].address
             if old_addr in self.address_map: del self.address_map[old_addr]
+        else:
+            heapq.heappush(self._expiry_heap, (now, player_id))
             
         self.players[player_id] = PlayerSession(
             address=addr,
             player_id=player_id,
-            last_seen=time.time()
+            last_seen=now
         )
         self.address_map[addr] = player_id
+        self._broadcast_addrs[player_id] = addr
         
-        self._send_to(addr, {
-            "command": "welcome", 
-            "server_time": time.time(),
-            "match_seed": self.match_seed
-        })
+        SERVER_TIME_STRUCT.pack_into(self._welcome, self._welcome_time_offset, time.time())
+        # Snapshot it: the template is rewritten by the next login before the flush
+        self._queue_payload((addr,), bytes(self._welcome))
 
     def _handle_update(self, message: dict, addr: Tuple[str, int]):
         player_id = self.address_map.get(addr)
         if not player_id: return
 
         session = self.players[player_id]
-        session.last_seen = time.time()
+        session.last_seen = time.monotonic()
         session.score = message.get("score", 0)
-        session.grid = message.get("grid", [])
+        session.grid = message.get("grid", b"")
         
         # Broadcast this update to everyone ELSE
         update_pkg = {
@@ -113,9 +187,11 @@ class TetrisServer:
             "grid": session.grid
         }
         
-        for pid, other in self.players.items():
-            if pid != player_id:
-                self._send_to(other.address, update_pkg)
+        # Take the sender out for the fan-out instead of comparing ids per recipient
+        others = self._broadcast_addrs
+        self_addr = others.pop(player_id)
+        self._queue_to_all(others.values(), update_pkg)
+        others[player_id] = self_addr
 
     def _handle_attack(self, message: dict, addr: Tuple[str, int]):
         sender_id = self.address_map.get(addr)
@@ -133,18 +209,69 @@ class TetrisServer:
             target_session = self.players[target_id]
             print(f"ATTACK: {sender_id} -> {target_id} ({lines} lines)")
             
-            self._send_to(target_session.address, {
+            self._queue_to(target_session.address, {
                 "command": "garbage",
                 "lines": lines,
                 "sender": sender_id
             })
 
-    def _send_to(self, addr: Tuple[str, int], data: dict):
+    def _queue_to(self, addr: Tuple[str, int], data: dict):
+        self._queue_to_all((addr,), data)
+
+    def _queue_to_all(self, addrs, data: dict):
+        """Encodes data once and queues it for every address until the next flush."""
+        if not addrs:
+            return
+        try:
+            payload = serialize(data)
+        except:
+            return
+        self._queue_payload(addrs, payload)
+
+    def _queue_payload(self, addrs, payload: bytes):
+        """Queues an already-encoded message for every address."""
+        queues = self._out_queues
+        for addr in addrs:
+            queue = queues.get(addr)
+            if queue is None:
+                queues[addr] = [payload]
+            else:
+                queue.append(payload)
+
+    def _flush_outgoing(self):
+        """Sends each address its queued messages, batched into as few datagrams as fit."""
+        if not self._out_queues:
+            return
+        buf = self._send_buf
+        prefix_size = BATCH_LEN_STRUCT.size
+        for addr, payloads in self._out_queues.items():
+            del buf[HEADER_SIZE:]
+            for payload in payloads:
+                if len(buf) > HEADER_SIZE and len(buf) + prefix_size + len(payload) > MAX_DATAGRAM_SIZE:
+                    self._send_buffer(addr)
+                    del buf[HEADER_SIZE:]
+                buf += BATCH_LEN_STRUCT.pack(len(payload))
+                buf += payload
+            self._send_buffer(addr)
+        self._out_queues.clear()
+
+    def _send_buffer(self, addr: Tuple[str, int]):
+        seq = (self._send_seqs.get(addr, 0) + 1) & 0xFFFFFFFF
+        self._send_seqs[addr] = seq
+        buf = self._send_buf
+        if len(buf) - HEADER_SIZE > COMPRESS_THRESHOLD:
+            body = zlib.compress(buf[HEADER_SIZE:], 1)
+            if len(body) < len(buf) - HEADER_SIZE:
+                try:
+                    self.socket.send(addr, HDR_STRUCT.pack(PROTOCOL_ID, seq, 0, BATCH_COMPRESSED) + body)
+                except:
+                    pass
+                return
+        SEQUENCE_STRUCT.pack_into(buf, SEQUENCE_OFFSET, seq)
         try:
-            payload_bytes = serialize(data)
-            header = PacketHeader()
-            packet = Packet(header, payload_bytes)
-            self.socket.send(addr, pack_packet(packet))
+            # The view must be released before the buffer is next resized
+            with memoryview(self._send_buf) as packet:
+                self.socket.send(addr, packet)
         except:
             pass
 
@@ -153,4 +280,5 @@ if __name__ == "__main__":
     try:
         server.run()
     except KeyboardInterrupt:
+        server._selector.close()
         server.socket.close()
\ No newline at end of file
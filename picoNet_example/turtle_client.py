@@ -4,6 +4,7 @@ turtle_client.py
 Client that sends turtle commands to the server.
 """
 import time
+import selectors
 import sys
 import os
 
@@ -11,7 +12,7 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from picoNet.connection import Connection, ConnectionState
+from picoNet.connection import Connection, ConnectionState, HANDSHAKE_RESEND_INTERVAL
 
 # The list of commands to be sent automatically
 COMMAND_SCRIPT = [
@@ -63,6 +64,9 @@ COMMAND_SCRIPT = [
     {'command': 'GOTO', 'x': 0, 'y': 0},
 ]
 
+# Commands are coalesced into one payload (and one datagram) per this many
+BATCH_SIZE = 8
+
 def main():
     """
     Initializes the client, connects to the server, and sends a script of commands.
@@ -74,14 +78,21 @@ def main():
     connection.connect()
 
     print("[CLIENT] Connecting to turtle server...")
-    # Wait for the connection to be established
-    connect_start_time = time.time()
-    while connection.state == ConnectionState.CONNECTING:
-        if time.time() - connect_start_time > 5.0:  # 5 second connect timeout
-            print("[CLIENT] Connection attempt timed out.")
-            return
-        connection.update(0.1)
-        time.sleep(0.1)
+    # Wait for the connection to be established, sleeping until the handshake
+    # response arrives (or a resend is due) rather than polling
+    selector = selectors.DefaultSelector()
+    selector.register(connection._socket, selectors.EVENT_READ)
+    connect_deadline = time.monotonic() + 5.0  # 5 second connect timeout
+    try:
+        while connection.state == ConnectionState.CONNECTING:
+            remaining = connect_deadline - time.monotonic()
+            if remaining <= 0:
+                print("[CLIENT] Connection attempt timed out.")
+                return
+            selector.select(min(remaining, HANDSHAKE_RESEND_INTERVAL))
+            connection.update(0.1)
+    finally:
+        selector.close()
 
     if not connection.is_connected:
         print("[CLIENT] Failed to connect to the server. Exiting.")
@@ -90,16 +101,17 @@ def main():
     print("[CLIENT] Connection successful! Sending commands...")
 
     try:
-        # Loop through the command script and send each one
-        for command_dict in COMMAND_SCRIPT:
-            cmd_name = command_dict.get('command', 'UNKNOWN')
-            print(f"[CLIENT] Sending: {cmd_name}")
-            connection.send(command_dict)
+        # Loop through the command script and send it a batch at a time
+        for i in range(0, len(COMMAND_SCRIPT), BATCH_SIZE):
+            batch = COMMAND_SCRIPT[i:i + BATCH_SIZE]
+            cmd_names = ", ".join(c.get('command', 'UNKNOWN') for c in batch)
+            print(f"[CLIENT] Sending: {cmd_names}")
+            connection.send({'batch': batch})
 
             # We must call update() regularly to process ACKs and keep the connection alive
             connection.update(0.1)
-            # Pause briefly to allow the server to process and draw
-            time.sleep(0.3)
+            # Pause to allow the server to process and draw the whole batch
+            time.sleep(0.3 * len(batch))
 
         print("\n[CLIENT] All commands sent. Keeping connection alive for 2 seconds...")
         # Keep connection alive for a final moment to ensure last packets are sent/acked
@@ -5,6 +5,7 @@ The server application that receives and executes turtle drawing commands.
 """
 import turtle
 import time
+import selectors
 import sys
 import os
 from typing import Dict, Any
@@ -16,48 +17,46 @@ sys.path.insert(0, project_root)
 from picoNet.connection import Connection, ConnectionState
 from picoNet.socket import PicoSocket
 
+# Command name -> handler(turtle, command_dict), so dispatch is one dict lookup
+COMMAND_HANDLERS = {
+    "FORWARD": lambda t, c: t.forward(c.get('distance', 0)),
+    "BACKWARD": lambda t, c: t.backward(c.get('distance', 0)),
+    "LEFT": lambda t, c: t.left(c.get('degrees', 0)),
+    "RIGHT": lambda t, c: t.right(c.get('degrees', 0)),
+    "CIRCLE": lambda t, c: t.circle(c.get('radius', 0)),
+    "DOT": lambda t, c: t.dot(c.get('radius', 0)),
+    "SPEED": lambda t, c: t.speed(c.get('speed', 0)),
+    "CLEAR": lambda t, c: t.clear(),
+    "RESET": lambda t, c: t.reset(),
+    "PENUP": lambda t, c: t.penup(),
+    "PENDOWN": lambda t, c: t.pendown(),
+    "HOME": lambda t, c: t.home(),
+    "GOTO": lambda t, c: t.goto(c.get('x', 0), c.get('y', 0)),
+    "COLOR": lambda t, c: t.color(c.get('color', 'black')),
+    "STAMP": lambda t, c: t.stamp(),
+    "PENSIZE": lambda t, c: t.pensize(c.get('size', 1)),
+}
+
 def execute_command(t: turtle.Turtle, command: Dict[str, Any]):
     """
     Executes a parsed command dictionary by calling the appropriate turtle methods.
+    A {'batch': [...]} payload from the client runs each of its commands in order.
     """
+    batch = command.get("batch")
+    if batch is not None:
+        for sub_command in batch:
+            execute_command(t, sub_command)
+        return
+
     cmd_type = command.get("command")
     print(f"[SERVER] Executing command: {cmd_type}")
     
     try:
-        if cmd_type == "FORWARD":
-            t.forward(command.get('distance', 0))
-        elif cmd_type == "BACKWARD":
-            t.backward(command.get('distance', 0))
-        elif cmd_type == "LEFT":
-            t.left(command.get('degrees', 0))
-        elif cmd_type == "RIGHT":
-            t.right(command.get('degrees', 0))
-        elif cmd_type == "CIRCLE":
-            t.circle(command.get('radius', 0))
-        elif cmd_type == "DOT":
-            t.dot(command.get('radius', 0))
-        elif cmd_type == "SPEED":
-            t.speed(command.get('speed', 0))
-        elif cmd_type == "CLEAR":
-            t.clear()
-        elif cmd_type == "RESET":
-            t.reset()
-        elif cmd_type == "PENUP":
-            t.penup()
-        elif cmd_type == "PENDOWN":
-            t.pendown()
-        elif cmd_type == "HOME":
-            t.home()
-        elif cmd_type == "GOTO":
-            t.goto(command.get('x', 0), command.get('y', 0))
-        elif cmd_type == "COLOR":
-            t.color(command.get('color', 'black'))
-        elif cmd_type == "STAMP":
-            t.stamp()
-        elif cmd_type == "PENSIZE":
-            t.pensize(command.get('size', 1))
-        else:
+        handler = COMMAND_HANDLERS.get(cmd_type)
+        if handler is None:
             print(f"[SERVER] Unknown command: {cmd_type}")
+        else:
+            handler(t, command)
     except Exception as e:
         print(f"[SERVER] Error executing {cmd_type}: {e}")
 
@@ -86,9 +85,18 @@ def main():
 
     last_ack_time = 0.0
     ACK_INTERVAL = 0.05  # Send ACKs every 50ms
+    SCREEN_INTERVAL = 1 / 60  # Redraw at most ~60 times a second
+
+    # Sleep in the kernel until a packet arrives or the next redraw is due,
+    # rather than waking every millisecond
+    selector = selectors.DefaultSelector()
+    selector.register(connection._socket, selectors.EVENT_READ)
+    next_screen_time = time.monotonic()
 
     try:
         while True:
+            selector.select(max(0.0, next_screen_time - time.monotonic()))
+
             # Update network connection frequently
             connection.update(0.01)
             
@@ -97,16 +105,22 @@ def main():
                 for command_dict in payloads:
                     execute_command(t, command_dict)
                 
-                # Send periodic ACK-only packets to acknowledge received commands
-                current_time = time.time()
-                if current_time - last_ack_time > ACK_INTERVAL:
-                    if connection._remote_sequence_number != -1:
-                        connection.send_ack_only()  # Use the new ACK-only method
+                # ACK whatever arrived since the last ACK, at most once per
+                # interval. Any packet counts, including resends of commands we
+                # already ran (their first ACK may have been lost); an idle
+                # link sends nothing.
+                current_time = time.monotonic()
+                if (connection.last_receive_time > last_ack_time
+                        and current_time - last_ack_time > ACK_INTERVAL
+                        and connection._remote_sequence_number != -1):
+                    connection.send_ack_only()  # Use the new ACK-only method
                     last_ack_time = current_time
             
             # Update turtle screen
-            screen.update()
-            time.sleep(0.001)
+            now = time.monotonic()
+            if now >= next_screen_time:
+                screen.update()
+                next_screen_time = now + SCREEN_INTERVAL
 
     except turtle.Terminator:
         print("[SERVER] Turtle window closed.")
@@ -114,6 +128,7 @@ def main():
         print("\n[SERVER] Server interrupted.")
     finally:
         print("[SERVER] Shutting down server.")
+        selector.close()
         connection.close()
 
 if __name__ == "__main__":
@@ -1,16 +1,24 @@
-import argparse
-parser=argparse.ArgumentParser()
-parser.add_argument("exect",type=str)
-parser.add_argument("src",type=str)
-args=parser.parse_args()
-import os
-if (args.exect=="compile"):
-    import pickle
-    with open(args.src,"r") as f:
+import sys
+# `rog compile|run <src>` is parsed by hand; argparse is only loaded for
+# anything else (--help, bad usage), since importing it slows every run
+if len(sys.argv)==3 and sys.argv[1] in ("compile","run"):
+    exect,src=sys.argv[1],sys.argv[2]
+else:
+    import argparse
+    parser=argparse.ArgumentParser()
+    parser.add_argument("exect",type=str)
+    parser.add_argument("src",type=str)
+    args=parser.parse_args()
+    exect,src=args.exect,args.src
+if (exect=="compile"):
+    import os
+    import marshal
+    with open(src,"r") as f:
         code=f.read()
     import battledex_engine.roguescript.lexer as lexer
     import battledex_engine.roguescript.parser as parser
     import battledex_engine.roguescript.compiler as compiler
+    from battledex_engine.roguescript.function import to_marshal
     lex=lexer.Lexer(code)
     tokens=lex.get_all_tokens()
     parse=parser.Parser(tokens)
@@ -19,13 +27,14 @@ if (args.exect=="compile"):
         print("COMPILE ERROR")
     comp=compiler.Compiler()
     bytecode=comp.compile(program)
-    v=".".join(os.path.basename(args.src).split('.')[:-1])
-    with open(f"{v}.rgb","wb") as f:
-        pickle.dump(bytecode,f)
-elif args.exect=="run":
-    import pickle
-    with open(args.src,"rb") as f:
-        bt=pickle.load(f)
+    v=".".join(os.path.basename(src).split('.')[:-1])
+    with open(f"{v}.rgbm","wb") as f:
+        marshal.dump(to_marshal(bytecode),f)
+elif exect=="run":
+    import marshal
+    from battledex_engine.roguescript.function import from_marshal
+    with open(src,"rb") as f:
+        bt=from_marshal(marshal.load(f))
     import battledex_engine.roguescript.vm as vmprovider
     vm = vmprovider.VirtualMachine()
     r,v=vm.execute(bt)
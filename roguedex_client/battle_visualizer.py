@@ -1,6 +1,10 @@
 import pygame
-from battledex_engine.state import GameState, GRID_WIDTH, GRID_HEIGHT, BUFFER_HEIGHT
-from battledex_engine.tetromino import COLORS
+import numpy as np
+from itertools import islice
+from battledex_engine.state import GameState, GRID_WIDTH, GRID_HEIGHT, BUFFER_HEIGHT, TOTAL_HEIGHT
+from battledex_engine.tetromino import SHAPES, COLORS, CELL_COLORS, SHAPE_BOUNDS, SHAPE_COLUMN_BOTTOMS, ALL_SHAPES
+from battledex_engine._kernels import drop_distance
+from roguedex_client.text_cache import TextCache
 
 # Colors
 BG_COLOR = (20, 20, 20)
@@ -8,6 +12,14 @@ GRID_BG_COLOR = (40, 40, 40)
 GRID_LINE_COLOR = (60, 60, 60)
 TEXT_COLOR = (240, 240, 240)
 GHOST_ALPHA = 60
+# Rendered text surfaces kept around; scores etc. change, labels don't
+TEXT_CACHE_SIZE = 256
+UNKNOWN_CELL_COLOR = (100, 100, 100)
+# Playfield pixel color per cell code; empty cells show the grid background.
+# The last entry is for codes the client doesn't know, which are clamped onto it.
+_CELL_LUT = np.array([GRID_BG_COLOR] + CELL_COLORS[1:] + [UNKNOWN_CELL_COLOR], dtype=np.uint8)
+_MAX_CELL = len(_CELL_LUT) - 1
+_COLUMN_BITS = (1 << np.arange(GRID_WIDTH)).astype(np.uint16)
 
 class BattleVisualizer:
     def __init__(self, screen: pygame.Surface, font: pygame.font.Font, combatant_map=None):
@@ -15,6 +27,29 @@ class BattleVisualizer:
         self.font = font
         self.combatant_map = combatant_map 
         self.small_font = pygame.font.Font(None, 20)
+        self._text_cache = TextCache(TEXT_CACHE_SIZE)
+        # Locked cells, rendered only when the board or block size changes
+        self._field_surf = None
+        self._field_key = None
+        self._cell_edges = None
+        # Top occupied row per column (TOTAL_HEIGHT if empty) and occupancy bit
+        # rows, the board indexes the engine keeps, for placing the ghost piece
+        self._col_heights = np.full(GRID_WIDTH, TOTAL_HEIGHT, dtype=np.int16)
+        self._row_bits = np.zeros(TOTAL_HEIGHT, dtype=np.uint16)
+        # Grid lines and border, rebuilt only when the block size changes
+        self._overlay_surf = None
+        self._overlay_block_size = None
+        # shape -> block Surface at the current block size, solid and ghost
+        self._block_surfs = {}
+        self._ghost_surfs = {}
+        self._opp_surfs = {} # opponent id -> (grid key, rendered mini grid Surface)
+        self._panels = {} # side panel name -> (contents key, Surface)
+        self._dim_surf = None # Full-screen translucent black behind the game over text
+        # Dirty-rect tracking: item name -> (key, screen Rect) as of the last frame
+        self._tracked = {}
+        self._dirty = []
+        self._last_layout = None
+        self._was_game_over = False
         self._update_layout()
 
     def _update_layout(self):
@@ -30,13 +65,31 @@ class BattleVisualizer:
         
         self.grid_x = (self.width - self.grid_w) // 2
         self.grid_y = (self.height - self.grid_h) // 2
+        # Screen position of every grid column and row (buffer rows land above the grid)
+        self._cell_x = [self.grid_x + x * self.block_size for x in range(GRID_WIDTH)]
+        self._cell_y = [self.grid_y + (y - BUFFER_HEIGHT) * self.block_size for y in range(TOTAL_HEIGHT)]
         
         # Increased side panel space and fixed gaps
         self.side_w = 120
         self.gap = 60
 
+        if self.block_size != self._overlay_block_size:
+            self._overlay_block_size = self.block_size
+            self._overlay_surf = self._build_grid_overlay()
+            self._block_surfs = {shape: self._build_block(color) for shape, color in COLORS.items()}
+            self._ghost_surfs = {shape: self._build_block(color, GHOST_ALPHA) for shape, color in COLORS.items()}
+
     def draw(self, state: GameState, logs: list = None, opponents: dict = None):
+        """
+        Draws one frame. Returns the screen Rects that may differ from the last
+        frame, or None if the whole screen must be presented (first frame,
+        resize, game over).
+        """
         self._update_layout() # Refresh layout
+        layout = (self.width, self.height, self.block_size)
+        full = layout != self._last_layout or state.game_over or self._was_game_over
+        self._last_layout, self._was_game_over = layout, state.game_over
+        self._dirty = []
         self.screen.fill(BG_COLOR)
         
         self._draw_grid_background()
@@ -53,105 +106,189 @@ class BattleVisualizer:
         
         if opponents:
             self._draw_opponents(opponents)
+        else:
+            self._track("opponents", None, None)
 
         if state.game_over:
             self._draw_game_over()
 
-    def _to_screen_coords(self, grid_x, grid_y):
-        screen_x = self.grid_x + (grid_x * self.block_size)
-        screen_y = self.grid_y + ((grid_y - BUFFER_HEIGHT) * self.block_size)
-        return screen_x, screen_y
+        return None if full else self._dirty
+
+    def _track(self, name, key, rect):
+        """Marks rect, and wherever the item was last frame, dirty if it moved or changed."""
+        prev = self._tracked.get(name)
+        if prev == (key, rect): return
+        if prev is not None and prev[1] is not None: self._dirty.append(prev[1])
+        if rect is not None: self._dirty.append(rect)
+        self._tracked[name] = (key, rect)
+
+    def _piece_rect(self, blocks):
+        """Screen Rect covering the given grid cells, clipped to the playfield."""
+        bs = self.block_size
+        xs = [x for x, _ in blocks]; ys = [y for _, y in blocks]
+        rect = pygame.Rect(self.grid_x + min(xs) * bs, self.grid_y + (min(ys) - BUFFER_HEIGHT) * bs,
+                           (max(xs) - min(xs) + 1) * bs, (max(ys) - min(ys) + 1) * bs)
+        return rect.clip((self.grid_x, self.grid_y, self.grid_w, self.grid_h))
+
+    def _text(self, text, color=TEXT_COLOR, font=None):
+        """Renders text through the LRU cache, so unchanged strings aren't rasterized every frame."""
+        return self._text_cache.render(font or self.font, text, color)
 
     def _draw_grid_background(self):
         rect = (self.grid_x, self.grid_y, self.grid_w, self.grid_h)
         pygame.draw.rect(self.screen, GRID_BG_COLOR, rect)
 
-    def _draw_grid_overlay(self):
+    def _build_grid_overlay(self):
+        # Drawn with a 2px margin so the thick border and buffer line fit
+        m = 2
+        surf = pygame.Surface((self.grid_w + 2 * m, self.grid_h + 2 * m), pygame.SRCALPHA)
         # Vertical lines
         for x in range(GRID_WIDTH + 1):
-            px = self.grid_x + x * self.block_size
-            pygame.draw.line(self.screen, GRID_LINE_COLOR, (px, self.grid_y), (px, self.grid_y + self.grid_h))
+            px = m + x * self.block_size
+            pygame.draw.line(surf, GRID_LINE_COLOR, (px, m), (px, m + self.grid_h))
         # Horizontal lines
         for y in range(GRID_HEIGHT + 1):
-            py = self.grid_y + y * self.block_size
-            pygame.draw.line(self.screen, GRID_LINE_COLOR, (self.grid_x, py), (self.grid_x + self.grid_w, py))
+            py = m + y * self.block_size
+            pygame.draw.line(surf, GRID_LINE_COLOR, (m, py), (m + self.grid_w, py))
         # Border and Buffer line
-        pygame.draw.rect(self.screen, (100, 100, 100), (self.grid_x, self.grid_y, self.grid_w, self.grid_h), 2)
-        pygame.draw.line(self.screen, (200, 50, 50), (self.grid_x, self.grid_y), (self.grid_x + self.grid_w, self.grid_y), 3)
+        pygame.draw.rect(surf, (100, 100, 100), (m, m, self.grid_w, self.grid_h), 2)
+        pygame.draw.line(surf, (200, 50, 50), (m, m), (m + self.grid_w, m), 3)
+        # Match the display's pixel layout so the per-frame blit takes the fast path
+        return surf.convert_alpha()
+
+    def _draw_grid_overlay(self):
+        self.screen.blit(self._overlay_surf, (self.grid_x - 2, self.grid_y - 2))
+
+    def _build_block(self, color, alpha=255):
+        """Returns one block_size cell in color; opaque cells get their 1px black outline baked in."""
+        surf = pygame.Surface((self.block_size, self.block_size))
+        surf.fill(color)
+        # Surface alpha, not per-pixel: it blends exactly like the old per-frame ghost cells
+        if alpha < 255: surf.set_alpha(alpha)
+        else: pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 1)
+        return surf
 
-    def _draw_block(self, x, y, color, alpha=255, outline=True):
+    def _draw_block(self, x, y, surf, outline=False):
         if y < BUFFER_HEIGHT: return
-        sx, sy = self._to_screen_coords(x, y)
-        rect = (sx, sy, self.block_size, self.block_size)
-        if alpha < 255:
-            s = pygame.Surface((self.block_size, self.block_size))
-            s.set_alpha(alpha); s.fill(color); self.screen.blit(s, (sx, sy))
-        else: pygame.draw.rect(self.screen, color, rect)
-        if outline: pygame.draw.rect(self.screen, (0, 0, 0), rect, 1)
+        sx, sy = self._cell_x[x], self._cell_y[y]
+        self.screen.blit(surf, (sx, sy))
+        if outline: pygame.draw.rect(self.screen, (0, 0, 0), (sx, sy, self.block_size, self.block_size), 1)
 
     def _draw_locked_blocks(self, state: GameState):
-        for y, row in enumerate(state.grid):
-            for x, cell in enumerate(row):
-                if cell != 0: self._draw_block(x, y, COLORS.get(cell, (100, 100, 100)))
+        key = (self.block_size, state.grid.tobytes())
+        if key != self._field_key:
+            self._field_key = key
+            self._render_field(state.grid[BUFFER_HEIGHT:])
+            occupied = state.grid != 0
+            self._col_heights[:] = np.where(occupied.any(axis=0), occupied.argmax(axis=0), TOTAL_HEIGHT)
+            self._row_bits[:] = occupied.astype(np.uint16) @ _COLUMN_BITS
+            self._dirty.append(pygame.Rect(self.grid_x, self.grid_y, self.grid_w, self.grid_h))
+        self.screen.blit(self._field_surf, (self.grid_x, self.grid_y))
+
+    def _render_field(self, visible):
+        """Paints the visible board into the cached field surface with one array write."""
+        bs = self.block_size
+        if self._field_surf is None or self._field_surf.get_size() != (self.grid_w, self.grid_h):
+            self._field_surf = pygame.Surface((self.grid_w, self.grid_h))
+            # Outline pixels of every cell, matching draw.rect(..., 1) per block
+            edge = np.zeros((bs, bs), dtype=bool)
+            edge[0, :] = edge[-1, :] = edge[:, 0] = edge[:, -1] = True
+            self._cell_edges = np.tile(edge, (GRID_HEIGHT, GRID_WIDTH))
+        pixels = _CELL_LUT[np.minimum(visible, _MAX_CELL)].repeat(bs, axis=0).repeat(bs, axis=1)
+        occupied = (visible != 0).repeat(bs, axis=0).repeat(bs, axis=1)
+        pixels[self._cell_edges & occupied] = 0
+        # surfarray is indexed [x, y]
+        pygame.surfarray.blit_array(self._field_surf, pixels.transpose(1, 0, 2))
 
     def _draw_active_piece(self, state: GameState):
-        if state.current_piece:
-            color = COLORS.get(state.current_piece.shape, (255, 255, 255))
-            for x, y in state.current_piece.get_blocks(): self._draw_block(x, y, color)
+        piece = state.current_piece
+        if not piece: return self._track("piece", None, None)
+        surf = self._block_surfs[piece.shape]
+        blocks, draw = piece.get_blocks(), self._draw_block
+        for x, y in blocks: draw(x, y, surf)
+        self._track("piece", (piece.shape, piece.rotation), self._piece_rect(blocks))
 
     def _draw_ghost_piece(self, state: GameState):
         piece = state.current_piece
-        if not piece: return
-        gy = piece.y
-        from battledex_engine.tetromino import SHAPES
+        if not piece: return self._track("ghost", None, None)
         local_coords = SHAPES[piece.shape][piece.rotation]
-        while True:
-            collision = False
-            for lx, ly in local_coords:
-                bx, by = piece.x + lx, gy + 1 + ly
-                if bx < 0 or bx >= GRID_WIDTH or by >= len(state.grid) or (by >= 0 and state.grid[by][bx] != 0):
-                    collision = True; break
-            if collision: break
-            gy += 1
-        color = COLORS.get(piece.shape, (255, 255, 255))
-        for lx, ly in local_coords: self._draw_block(piece.x + lx, gy + ly, color, alpha=GHOST_ALPHA)
+        # Land the lowest block of each column on that column's top cell
+        cols, bottoms = SHAPE_COLUMN_BOTTOMS[piece.shape][piece.rotation]
+        gy = int((self._col_heights[cols + piece.x] - bottoms).min()) - 1
+        if gy < piece.y:
+            # Something overhangs the piece; step down with the engine's kernel
+            gy = piece.y + int(drop_distance(self._row_bits, ALL_SHAPES, piece.shape_id, piece.rotation, piece.x, piece.y))
+        surf = self._ghost_surfs[piece.shape]
+        px, draw = piece.x, self._draw_block
+        blocks = [(px + lx, gy + ly) for lx, ly in local_coords]
+        for x, y in blocks: draw(x, y, surf, True)
+        self._track("ghost", (piece.shape, piece.rotation), self._piece_rect(blocks))
+
+    def _panel(self, name, key, render, *args):
+        """Returns a side panel Surface, rebuilt with render(*args) only when its key changes."""
+        cached = self._panels.get(name)
+        if cached is not None and cached[0] == key: return cached[1]
+        surf = render(*args)
+        self._panels[name] = (key, surf)
+        return surf
 
     def _draw_hold_queue(self, state: GameState):
         hx = self.grid_x - self.side_w - self.gap
         hy = self.grid_y
-        self.screen.blit(self.font.render("HOLD", True, TEXT_COLOR), (hx, hy - 35))
-        pygame.draw.rect(self.screen, GRID_BG_COLOR, (hx, hy, self.side_w, self.side_w))
-        pygame.draw.rect(self.screen, (100, 100, 100), (hx, hy, self.side_w, self.side_w), 1)
-        if state.hold_piece: self._draw_mini_piece(state.hold_piece, hx + self.side_w // 2, hy + self.side_w // 2)
+        key = (self.side_w, self.block_size, state.hold_piece)
+        # The panel starts at the label, 35px above the box
+        self._track("hold", key, self.screen.blit(self._panel("hold", key, self._render_hold, state.hold_piece), (hx, hy - 35)))
+
+    def _render_hold(self, hold_piece):
+        surf = pygame.Surface((self.side_w, 35 + self.side_w)); surf.fill(BG_COLOR)
+        surf.blit(self._text("HOLD"), (0, 0))
+        pygame.draw.rect(surf, GRID_BG_COLOR, (0, 35, self.side_w, self.side_w))
+        pygame.draw.rect(surf, (100, 100, 100), (0, 35, self.side_w, self.side_w), 1)
+        if hold_piece: self._draw_mini_piece(surf, hold_piece, self.side_w // 2, 35 + self.side_w // 2)
+        return surf
 
     def _draw_next_queue(self, state: GameState):
         nx = self.grid_x + self.grid_w + self.gap
         ny = self.grid_y
-        self.screen.blit(self.font.render("NEXT", True, TEXT_COLOR), (nx, ny - 35))
-        for i, shape in enumerate(state.next_queue[:5]):
-            slot_y = ny + i * (self.side_w + 10)
-            pygame.draw.rect(self.screen, GRID_BG_COLOR, (nx, slot_y, self.side_w, self.side_w))
-            pygame.draw.rect(self.screen, (100, 100, 100), (nx, slot_y, self.side_w, self.side_w), 1)
-            self._draw_mini_piece(shape, nx + self.side_w // 2, slot_y + self.side_w // 2)
-
-    def _draw_mini_piece(self, shape, cx, cy):
-        from battledex_engine.tetromino import SHAPES
+        shapes = tuple(islice(state.next_queue, 5))
+        key = (self.side_w, self.block_size, shapes)
+        self._track("next", key, self.screen.blit(self._panel("next", key, self._render_next, shapes), (nx, ny - 35)))
+
+    def _render_next(self, shapes):
+        surf = pygame.Surface((self.side_w, 35 + 5 * (self.side_w + 10))); surf.fill(BG_COLOR)
+        surf.blit(self._text("NEXT"), (0, 0))
+        for i, shape in enumerate(shapes):
+            slot_y = 35 + i * (self.side_w + 10)
+            pygame.draw.rect(surf, GRID_BG_COLOR, (0, slot_y, self.side_w, self.side_w))
+            pygame.draw.rect(surf, (100, 100, 100), (0, slot_y, self.side_w, self.side_w), 1)
+            self._draw_mini_piece(surf, shape, self.side_w // 2, slot_y + self.side_w // 2)
+        return surf
+
+    def _draw_mini_piece(self, surf, shape, cx, cy):
         coords = SHAPES[shape][0]
         mini_size = self.block_size if self.block_size > 20 else 20
-        min_x, max_x = min(c[0] for c in coords), max(c[0] for c in coords)
-        min_y, max_y = min(c[1] for c in coords), max(c[1] for c in coords)
+        min_x, max_x, min_y, max_y = SHAPE_BOUNDS[shape][0]
         w, h = (max_x - min_x + 1) * mini_size, (max_y - min_y + 1) * mini_size
         sx, sy = cx - w // 2, cy - h // 2
+        color, draw_rect = COLORS[shape], pygame.draw.rect
         for x, y in coords:
-            pygame.draw.rect(self.screen, COLORS[shape], (sx + (x - min_x) * mini_size, sy + (y - min_y) * mini_size, mini_size, mini_size))
-            pygame.draw.rect(self.screen, (0,0,0), (sx + (x - min_x) * mini_size, sy + (y - min_y) * mini_size, mini_size, mini_size), 1)
+            draw_rect(surf, color, (sx + (x - min_x) * mini_size, sy + (y - min_y) * mini_size, mini_size, mini_size))
+            draw_rect(surf, (0,0,0), (sx + (x - min_x) * mini_size, sy + (y - min_y) * mini_size, mini_size, mini_size), 1)
 
     def _draw_stats(self, state: GameState):
         # Align stats to the left of the hold box
         sx = self.grid_x - self.side_w - self.gap
         sy = self.grid_y + self.side_w + 60
-        stats = [f"SCORE: {state.score}", f"LEVEL: {state.level}", f"LINES: {state.lines_cleared}", f"COMBO: {max(0, state.combo)}"]
-        for i, line in enumerate(stats): self.screen.blit(self.font.render(line, True, TEXT_COLOR), (sx, sy + i * 45))
+        key = (state.score, state.level, state.lines_cleared, max(0, state.combo))
+        self._track("stats", key, self.screen.blit(self._panel("stats", key, self._render_stats, *key), (sx, sy)))
+
+    def _render_stats(self, score, level, lines, combo):
+        stats = [f"SCORE: {score}", f"LEVEL: {level}", f"LINES: {lines}", f"COMBO: {combo}"]
+        texts = [self._text(line) for line in stats]
+        # Transparent, since long scores run over the playfield
+        surf = pygame.Surface((max(t.get_width() for t in texts), 3 * 45 + texts[-1].get_height()), pygame.SRCALPHA)
+        for i, t in enumerate(texts): surf.blit(t, (0, i * 45))
+        return surf
 
     def _draw_rhythm_indicator(self, state: GameState):
         rx, ry, rw, rh = self.grid_x, self.grid_y + self.grid_h + 20, self.grid_w, int(self.block_size * 1.5)
@@ -178,28 +315,52 @@ class BattleVisualizer:
         
         if is_on_beat: pygame.draw.circle(self.screen, (0, 255, 0), (rx - 30, ry + rh // 2), 10)
         else: pygame.draw.circle(self.screen, (100, 0, 0), (rx - 30, ry + rh // 2), 5)
+        # The cursor moves every frame; cover the bar and the beat light
+        self._dirty.append(pygame.Rect(rx - 40, ry, rw + 42, rh + 2))
 
     def _draw_attack_buffer(self, state: GameState):
-        if hasattr(state, 'attack_buffer') and state.attack_buffer > 0:
-            self.screen.blit(self.font.render(f"READY: {state.attack_buffer} L", True, (255, 100, 100)), (self.grid_x, self.grid_y + self.grid_h + 70))
+        rect = None
+        if state.attack_buffer > 0:
+            rect = self.screen.blit(self._text(f"READY: {state.attack_buffer} L", (255, 100, 100)), (self.grid_x, self.grid_y + self.grid_h + 70))
+        self._track("attack", state.attack_buffer, rect)
 
     def _draw_opponents(self, opponents):
         ox_start = self.grid_x + self.grid_w + self.side_w + 60
         oy_start, m_size = self.grid_y, self.block_size // 3
+        # Boards, names and scores don't overlap, so they all go out in one blits call
+        blits, boards = [], []
         for i, (oid, data) in enumerate(opponents.items()):
             if i > 2: break
             ox = ox_start + i * (GRID_WIDTH * m_size + 30)
-            self.screen.blit(self.small_font.render(oid[:10], True, TEXT_COLOR), (ox, oy_start - 25))
+            blits.append((self._text(oid[:10], font=self.small_font), (ox, oy_start - 25)))
             pygame.draw.rect(self.screen, GRID_BG_COLOR, (ox, oy_start, GRID_WIDTH * m_size, GRID_HEIGHT * m_size))
-            grid = data.get("grid", [])
-            for gy, row in enumerate(grid):
-                for gx, cell in enumerate(row):
-                    if cell != 0: pygame.draw.rect(self.screen, COLORS.get(cell, (100, 100, 100)), (ox + gx * m_size, oy_start + gy * m_size, m_size, m_size))
-            self.screen.blit(self.small_font.render(f"S: {data.get('score', 0)}", True, TEXT_COLOR), (ox, oy_start + GRID_HEIGHT * m_size + 5))
+            grid = np.asarray(data.get("grid", []), dtype=np.uint8)
+            if grid.size: blits.append((self._mini_grid(oid, grid, m_size), (ox, oy_start)))
+            blits.append((self._text(f"S: {data.get('score', 0)}", font=self.small_font), (ox, oy_start + GRID_HEIGHT * m_size + 5)))
+            boards.append(pygame.Rect(ox, oy_start, GRID_WIDTH * m_size, GRID_HEIGHT * m_size))
+        # Opponent updates arrive whenever, so their area is always presented
+        area = boards[0].unionall(boards[1:] + self.screen.blits(blits))
+        self._dirty.append(area)
+        self._track("opponents", None, area)
+
+    def _mini_grid(self, oid, grid, m_size):
+        """Returns the opponent's board as a Surface, repainted only when it changes."""
+        key = (m_size, grid.shape, grid.tobytes())
+        cached = self._opp_surfs.get(oid)
+        if cached is not None and cached[0] == key: return cached[1]
+        # Opponent grids come off the network, so any byte value can show up
+        pixels = _CELL_LUT[np.minimum(grid, _MAX_CELL)].repeat(m_size, axis=0).repeat(m_size, axis=1)
+        surf = pygame.Surface((pixels.shape[1], pixels.shape[0]))
+        # surfarray is indexed [x, y]
+        pygame.surfarray.blit_array(surf, pixels.transpose(1, 0, 2))
+        self._opp_surfs[oid] = (key, surf)
+        return surf
 
     def _draw_game_over(self):
-        overlay = pygame.Surface((self.width, self.height)); overlay.set_alpha(180); overlay.fill((0, 0, 0)); self.screen.blit(overlay, (0, 0))
-        t = self.font.render("GAME OVER", True, (255, 50, 50))
+        if self._dim_surf is None or self._dim_surf.get_size() != (self.width, self.height):
+            self._dim_surf = pygame.Surface((self.width, self.height)); self._dim_surf.set_alpha(180); self._dim_surf.fill((0, 0, 0))
+        self.screen.blit(self._dim_surf, (0, 0))
+        t = self._text("GAME OVER", (255, 50, 50))
         self.screen.blit(t, t.get_rect(center=(self.width // 2, self.height // 2)))
-        s = self.small_font.render("Press SPACE to restart", True, (200, 200, 200))
+        s = self._text("Press SPACE to restart", (200, 200, 200), self.small_font)
         self.screen.blit(s, s.get_rect(center=(self.width // 2, self.height // 2 + 50)))
\ No newline at end of file
@@ -3,14 +3,17 @@ import os
 import pygame
 import time
 import random
+import numpy as np
 from enum import Enum, auto
 
 # Add project root to path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from battledex_engine.tetris_engine import TetrisEngine
+from battledex_engine.state import GRID_WIDTH, GRID_HEIGHT
 from battledex_engine.rogue_bot import RogueBot
 from roguedex_client.battle_visualizer import BattleVisualizer
+from roguedex_client.text_cache import TextCache
 from roguedex_client.network_client import NetworkClient
 from roguedex_client.sound_manager import SoundManager
 
@@ -20,6 +23,20 @@ def load_bot_script():
         with open("bot_script.rogue", "r") as f: return f.read()
     except: return "hard_drop();"
 
+def decode_grid(grid):
+    """Opponent grids arrive as raw bytes, one cell per byte, row-major. A blob of the wrong size is dropped."""
+    if isinstance(grid, bytes):
+        if len(grid) != GRID_WIDTH * GRID_HEIGHT: return []
+        return np.frombuffer(grid, dtype=np.uint8).reshape(GRID_HEIGHT, GRID_WIDTH)
+    return grid or []
+
+# Actions whose keys auto-repeat (DAS/ARR) while held
+REPEAT_ACTIONS = ('move_left', 'move_right', 'move_down')
+
+# The only event types the client reads; the rest (mouse motion above all) are
+# blocked at the source. TEXTINPUT stays on because KEYDOWN.unicode is filled from it.
+HANDLED_EVENTS = [pygame.QUIT, pygame.VIDEORESIZE, pygame.WINDOWEXPOSED, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT]
+
 class GamePhase(Enum):
     MENU = auto()
     SETTINGS = auto()
@@ -34,12 +51,22 @@ class RogueDexTetrisClient:
         self.width, self.height = 1000, 900
         self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
         pygame.display.set_caption("RogueDex Rhythm Tetris")
+        pygame.event.set_blocked(None); pygame.event.set_allowed(HANDLED_EVENTS)
         self.clock = pygame.time.Clock()
+        self._text_cache = TextCache() # Menu and HUD text, re-rendered only when it changes
         self._update_fonts()
         self.bot_source = load_bot_script()
         try: self.sound_manager = SoundManager()
         except: self.sound_manager = None
 
+        # Per-phase (keydown handler, draw method); assigning self.phase binds them
+        self._phase_handlers = {
+            GamePhase.MENU: (lambda e: self._handle_menu_input(e.key), self._draw_menu),
+            GamePhase.SETTINGS: (self._handle_settings_input, self._draw_settings),
+            GamePhase.KEYMAP: (self._handle_keymap_input, self._draw_keymap),
+            GamePhase.INFO: (lambda e: self._handle_info_input(e.key), self._draw_info),
+            GamePhase.PLAYING: (lambda e: self._handle_game_keydown(e.key), self._draw_playing),
+        }
         self.phase = GamePhase.MENU
         self.server_ip = os.environ.get("SERVER_IP", "")
         self.network = None
@@ -49,6 +76,7 @@ class RogueDexTetrisClient:
             'move_left': pygame.K_LEFT, 'move_right': pygame.K_RIGHT, 'move_down': pygame.K_DOWN,
             'rotate_cw': pygame.K_UP, 'rotate_ccw': pygame.K_z, 'hard_drop': pygame.K_SPACE, 'hold': pygame.K_c
         }
+        self._bind_keys()
         
         self.settings_index = 0
         self.settings_options = ['Server IP', 'DAS (ms)', 'ARR (ms)', 'Infinite Soft Drop', 'Edit Keybinds', 'Back']
@@ -61,6 +89,21 @@ class RogueDexTetrisClient:
         
         self.key_timers, self.engine, self.visualizer, self.bot = {}, None, None, None
         self.auto_mode, self.last_bot_tick, self.connected, self.pending_start, self.running = False, 0, False, False, True
+        self.last_drawn_phase = None
+
+    @property
+    def phase(self): return self._phase
+
+    @phase.setter
+    def phase(self, phase):
+        # Bound once per transition so per-frame code never compares phases
+        self._phase, self.playing = phase, phase is GamePhase.PLAYING
+        self._phase_keydown, self._draw_phase = self._phase_handlers[phase]
+
+    def _bind_keys(self):
+        """Rebuilds the key -> action table from self.keybinds; call after editing a binding."""
+        # Filled in reverse so that, for a key bound twice, the earlier action wins
+        self._key_actions = {key: action for action, key in reversed(self.keybinds.items())}
 
     def _update_fonts(self):
         # Scale fonts based on window height
@@ -80,8 +123,12 @@ class RogueDexTetrisClient:
     def run(self):
         while self.running:
             dt = self.clock.tick(60) / 1000.0
+            # Input and update share one engine clock sample per frame
+            engine = self.engine if self.playing else None
+            if engine: engine.begin_frame()
             self._handle_input()
             self._update(dt)
+            if engine: engine.end_frame()
             self._draw()
         if self.network: self.network.close()
         pygame.quit()
@@ -108,14 +155,11 @@ class RogueDexTetrisClient:
                     self._update_fonts()
                     if self.visualizer:
                         self.visualizer = BattleVisualizer(self.screen, self.font)
-            elif event.type == pygame.KEYDOWN:
-                if self.phase == GamePhase.MENU: self._handle_menu_input(event.key)
-                elif self.phase == GamePhase.SETTINGS: self._handle_settings_input(event)
-                elif self.phase == GamePhase.KEYMAP: self._handle_keymap_input(event)
-                elif self.phase == GamePhase.INFO: self._handle_info_input(event.key)
-                elif self.phase == GamePhase.PLAYING: self._handle_game_keydown(event.key)
+            # The window's old contents may be gone; present the next frame whole
+            elif event.type == pygame.WINDOWEXPOSED: self.last_drawn_phase = None
+            elif event.type == pygame.KEYDOWN: self._phase_keydown(event)
             elif event.type == pygame.KEYUP:
-                if self.phase == GamePhase.PLAYING and event.key in self.key_timers: del self.key_timers[event.key]
+                if self.playing and event.key in self.key_timers: del self.key_timers[event.key]
 
     def _handle_menu_input(self, key):
         if key == pygame.K_1: self.start_game(multiplayer=False)
@@ -155,7 +199,7 @@ class RogueDexTetrisClient:
     def _handle_keymap_input(self, event):
         if self.binding_action:
             if event.type == pygame.KEYDOWN:
-                if event.key != pygame.K_ESCAPE: self.keybinds[self.binding_action] = event.key
+                if event.key != pygame.K_ESCAPE: self.keybinds[self.binding_action] = event.key; self._bind_keys()
                 self.binding_action = None
             return
         if event.type != pygame.KEYDOWN: return
@@ -176,30 +220,21 @@ class RogueDexTetrisClient:
 
     def _handle_game_keydown(self, key):
         if not self.engine: return
-        if key in [self.keybinds['move_left'], self.keybinds['move_right'], self.keybinds['move_down']]:
+        action = self._key_actions.get(key)
+        if action in REPEAT_ACTIONS:
             self.key_timers[key] = {'start_time': time.time(), 'last_trigger': time.time(), 'das_triggered': False}
-            action = None
-            if key == self.keybinds['move_left']: action = 'move_left'
-            elif key == self.keybinds['move_right']: action = 'move_right'
-            elif key == self.keybinds['move_down']:
-                if self.soft_drop_infinite:
-                    while self.engine.move(0, 1): pass
-                    self._play_action_sound('moved'); return
-                else: action = 'move_down'
-            if action: self._play_action_sound(self.engine.submit_action(action))
+            if action == 'move_down' and self.soft_drop_infinite:
+                while self.engine.move(0, 1): pass
+                self._play_action_sound('moved'); return
+            self._play_action_sound(self.engine.submit_action(action))
             return
         if self.engine.state.game_over:
             if key == pygame.K_SPACE: self.start_game(multiplayer=(self.network is not None))
             elif key == pygame.K_ESCAPE: self.phase = GamePhase.MENU; (self.network.close() if self.network else None); self.network = None; self.key_timers = {}
             return
         if key == pygame.K_F5: self.bot_source = load_bot_script(); return
-        action = None
-        if key == self.keybinds['rotate_cw']: action = 'rotate_cw'
-        elif key == self.keybinds['rotate_ccw']: action = 'rotate_ccw'
-        elif key == self.keybinds['hard_drop']: action = 'hard_drop'
-        elif key == self.keybinds['hold']: action = 'hold'
-        elif key == pygame.K_ESCAPE: self.phase = GamePhase.MENU; (self.network.close() if self.network else None); self.network = None; self.key_timers = {}; return
         if action: self._play_action_sound(self.engine.submit_action(action))
+        elif key == pygame.K_ESCAPE: self.phase = GamePhase.MENU; (self.network.close() if self.network else None); self.network = None; self.key_timers = {}
 
     def _play_action_sound(self, result):
         if self.sound_manager:
@@ -208,10 +243,10 @@ class RogueDexTetrisClient:
 
     def _update(self, dt):
         if self.network:
-            if self.phase == GamePhase.PLAYING:
+            if self.playing:
                 self.update_timer += dt
                 if self.update_timer > 0.1:
-                    self.network.send({"command": "update", "score": self.engine.state.score, "grid": self.engine.state.get_visible_grid()})
+                    self.network.send({"command": "update", "score": self.engine.state.score, "grid": self.engine.state.get_visible_grid().tobytes()})
                     self.update_timer = 0
             for msg in self.network.get_messages():
                 cmd = msg.get("command")
@@ -223,8 +258,8 @@ class RogueDexTetrisClient:
                     if self.pending_start:
                         self.engine = TetrisEngine(bpm=128.0, seed=seed)
                         self.bot, self.visualizer, self.phase, self.pending_start = RogueBot(self.engine), BattleVisualizer(self.screen, self.font), GamePhase.PLAYING, False
-                elif cmd == "opponent_update": self.opponents[msg.get("player_id")] = {"score": msg.get("score"), "grid": msg.get("grid")}
-        if self.phase == GamePhase.PLAYING:
+                elif cmd == "opponent_update": self.opponents[msg.get("player_id")] = {"score": msg.get("score"), "grid": decode_grid(msg.get("grid"))}
+        if self.playing:
             self.engine.update(dt)
             now = time.time()
             for k, d in list(self.key_timers.items()):
@@ -238,7 +273,7 @@ class RogueDexTetrisClient:
             curr_beat = int(self.engine.state.current_beat)
             if curr_beat > self.last_beat_int:
                 if self.sound_manager: self.sound_manager.play('beat')
-                if self.network and hasattr(self.engine.state, 'attack_buffer') and self.engine.state.attack_buffer > 0:
+                if self.network and self.engine.state.attack_buffer > 0:
                     self.network.send_attack(self.engine.state.attack_buffer); self.engine.state.attack_buffer = 0
                 self.last_beat_int = curr_beat
             if self.engine.state.lines_cleared > self.last_lines_cleared:
@@ -249,37 +284,39 @@ class RogueDexTetrisClient:
                 if on_beat and now - self.last_bot_tick > 0.2: self.bot.run_script(self.bot_source); self.last_bot_tick = now
 
     def _trigger_repeat(self, key):
-        if key == self.keybinds['move_left']:
-            if self.arr_rate == 0:
-                while self.engine.move(-1, 0): pass
-            else: self.engine.submit_action('move_left')
-        elif key == self.keybinds['move_right']:
-            if self.arr_rate == 0:
-                while self.engine.move(1, 0): pass
-            else: self.engine.submit_action('move_right')
-        elif key == self.keybinds['move_down']: self.engine.submit_action('move_down')
+        action = self._key_actions.get(key)
+        if action == 'move_down' or (action in REPEAT_ACTIONS and self.arr_rate != 0): self.engine.submit_action(action)
+        elif action == 'move_left':
+            while self.engine.move(-1, 0): pass
+        elif action == 'move_right':
+            while self.engine.move(1, 0): pass
 
     def _draw(self):
         self.screen.fill((40, 40, 60))
-        if self.phase == GamePhase.MENU: self._draw_menu()
-        elif self.phase == GamePhase.SETTINGS: self._draw_settings()
-        elif self.phase == GamePhase.KEYMAP: self._draw_keymap()
-        elif self.phase == GamePhase.INFO: self._draw_info()
-        elif self.phase == GamePhase.PLAYING:
-            self.visualizer.draw(self.engine.state, opponents=self.opponents)
-            if self.auto_mode:
-                text = self.font.render("AUTO MODE", True, (255, 200, 0))
-                self.screen.blit(text, (20, 20))
-            if self.network:
-                status_color = (0, 255, 0) if self.connected else (255, 100, 0)
-                conn_text = self.font.render("ONLINE" if self.connected else "CONNECTING...", True, status_color)
-                self.screen.blit(conn_text, (self.width - 150, 20))
-        pygame.display.flip()
+        # Rects to present, or None for the whole screen; only playing frames give rects
+        dirty = self._draw_phase()
+        # Only a frame in the same phase as the last one can be presented partially
+        if dirty is None or self._phase is not self.last_drawn_phase: pygame.display.flip()
+        else: pygame.display.update(dirty)
+        self.last_drawn_phase = self._phase
+
+    def _draw_playing(self):
+        dirty = self.visualizer.draw(self.engine.state, opponents=self.opponents)
+        if self.auto_mode:
+            text = self._text_cache.render(self.font, "AUTO MODE", (255, 200, 0))
+            self.screen.blit(text, (20, 20))
+        if self.network:
+            status_color = (0, 255, 0) if self.connected else (255, 100, 0)
+            conn_text = self._text_cache.render(self.font, "ONLINE" if self.connected else "CONNECTING...", status_color)
+            self.screen.blit(conn_text, (self.width - 150, 20))
+        # The status badges along the top can change at any time
+        if dirty is not None: dirty.append(pygame.Rect(0, 20, self.width, self.font.get_height()))
+        return dirty
 
     def _draw_menu(self):
         cx = self.width // 2
         # Title at 15% height
-        title = self.title_font.render("RHYTHM TETRIS", True, (0, 255, 255))
+        title = self._text_cache.render(self.title_font, "RHYTHM TETRIS", (0, 255, 255))
         self.screen.blit(title, title.get_rect(center=(cx, self.height * 0.15)))
         
         opts = ["Press [1] for Singleplayer", f"Press [2] for Multiplayer {'(Ready)' if self.server_ip else '(No IP)'}", 
@@ -289,7 +326,7 @@ class RogueDexTetrisClient:
         
         start_y = self.height * 0.25
         for i, l in enumerate(opts):
-            text = self.font.render(l, True, (200, 200, 200))
+            text = self._text_cache.render(self.font, l, (200, 200, 200))
             self.screen.blit(text, text.get_rect(center=(cx, start_y + i * (self.height * 0.055))))
             
         inst = ["MECHANICS: SRS Rotation, 7-Bag, Rhythmic Attacks", 
@@ -301,12 +338,12 @@ class RogueDexTetrisClient:
         inst_y = self.height * 0.75
         for i, l in enumerate(inst):
             color = (100, 255, 100) if i == 1 else (150, 150, 150)
-            text = self.small_font.render(l, True, color)
+            text = self._text_cache.render(self.small_font, l, color)
             self.screen.blit(text, text.get_rect(center=(cx, inst_y + i * (self.height * 0.04))))
 
     def _draw_settings(self):
         cx = self.width // 2
-        title = self.title_font.render("SETTINGS", True, (0, 255, 255))
+        title = self._text_cache.render(self.title_font, "SETTINGS", (0, 255, 255))
         self.screen.blit(title, title.get_rect(center=(cx, self.height * 0.15)))
         
         start_y = self.height * 0.3
@@ -315,12 +352,12 @@ class RogueDexTetrisClient:
             val = {"Server IP": self.server_ip, "DAS (ms)": f"{int(self.das_delay*1000)}", 
                    "ARR (ms)": f"{int(self.arr_rate*1000)}", "Infinite Soft Drop": "ON" if self.soft_drop_infinite else "OFF", 
                    "Edit Keybinds": "", "Back": ""}.get(opt, "")
-            text = self.font.render(f"{opt}: {val}", True, color)
+            text = self._text_cache.render(self.font, f"{opt}: {val}", color)
             self.screen.blit(text, text.get_rect(center=(cx, start_y + i * (self.height * 0.07))))
 
     def _draw_keymap(self):
         cx = self.width // 2
-        title = self.title_font.render("KEYBIND EDITOR", True, (0, 255, 255))
+        title = self._text_cache.render(self.title_font, "KEYBIND EDITOR", (0, 255, 255))
         self.screen.blit(title, title.get_rect(center=(cx, self.height * 0.15)))
         
         actions = list(self.keybinds.keys()) + ["Back"]
@@ -328,17 +365,17 @@ class RogueDexTetrisClient:
         for i, act in enumerate(actions):
             color = (255, 255, 0) if i == self.keymap_index else (200, 200, 200)
             key_name = pygame.key.name(self.keybinds[act]).upper() if act in self.keybinds else ""
-            text = self.font.render(f"{act.replace('_',' ').upper()}: {key_name}", True, color)
+            text = self._text_cache.render(self.font, f"{act.replace('_',' ').upper()}: {key_name}", color)
             self.screen.blit(text, text.get_rect(center=(cx, start_y + i * (self.height * 0.06))))
             
         if self.binding_action:
             overlay = pygame.Surface((self.width, self.height)); overlay.set_alpha(180); overlay.fill((0,0,0)); self.screen.blit(overlay, (0,0))
-            msg = self.font.render(f"PRESS ANY KEY FOR: {self.binding_action.replace('_',' ').upper()}", True, (255, 255, 255))
+            msg = self._text_cache.render(self.font, f"PRESS ANY KEY FOR: {self.binding_action.replace('_',' ').upper()}", (255, 255, 255))
             self.screen.blit(msg, msg.get_rect(center=(cx, self.height // 2)))
 
     def _draw_info(self):
         cx = self.width // 2
-        title = self.font.render("GAME MECHANICS (Scroll with Arrows/PgUp/PgDn)", True, (0, 255, 255))
+        title = self._text_cache.render(self.font, "GAME MECHANICS (Scroll with Arrows/PgUp/PgDn)", (0, 255, 255))
         self.screen.blit(title, title.get_rect(center=(cx, self.height * 0.05)))
         
         y_start = self.height * 0.12
@@ -353,10 +390,10 @@ class RogueDexTetrisClient:
             elif line.startswith("## "): color = (255, 255, 0)
             else: fnt = self.small_font
             
-            text = fnt.render(line, True, color)
+            text = self._text_cache.render(fnt, line, color)
             self.screen.blit(text, (self.width * 0.06, y_start + i * (self.height * 0.03)))
             
-        help_msg = self.small_font.render("Press ESC or ENTER to return", True, (150, 150, 150))
+        help_msg = self._text_cache.render(self.small_font, "Press ESC or ENTER to return", (150, 150, 150))
         self.screen.blit(help_msg, help_msg.get_rect(center=(cx, self.height * 0.95)))
 
 if __name__ == "__main__":
@@ -2,7 +2,8 @@ import time
 import threading
 from typing import Tuple, Optional
 from picoNet.socket import PicoSocket
-from picoNet.packet import Packet, PacketHeader, PROTOCOL_ID, pack_packet, unpack_packet
+from picoNet.packet import (PacketHeader, PROTOCOL_MAGIC, BATCH_COMPRESSED, pack_batch,
+                            unpack_packet, unpack_batch)
 from picoNet.serializer import serialize, deserialize
 
 class NetworkClient:
@@ -24,25 +25,24 @@ class NetworkClient:
             result = self.socket.receive()
             if result:
                 data, addr = result
-                # Only accept from server
-                if addr != self.server_addr:
+                # Only accept our protocol, from the server
+                if addr != self.server_addr or data[:4] != PROTOCOL_MAGIC:
                     continue
                     
                 try:
                     packet = unpack_packet(data)
-                    if packet.header.protocol_id == PROTOCOL_ID:
-                        payload = deserialize(packet.payload)
-                        self.inbox.append(payload)
+                    # The server batches a tick's messages into one datagram,
+                    # compressing it when large
+                    compressed = packet.header.ack_bitfield & BATCH_COMPRESSED
+                    for payload in unpack_batch(packet.payload, compressed):
+                        self.inbox.append(deserialize(payload))
                 except Exception as e:
                     print(f"Network Error: {e}")
             else:
                 time.sleep(0.001)
 
     def send(self, data: dict):
-        payload_bytes = serialize(data)
-        header = PacketHeader()
-        packet = Packet(header, payload_bytes)
-        packet_bytes = pack_packet(packet)
+        packet_bytes = pack_batch(PacketHeader(), [serialize(data)])
         self.socket.send(self.server_addr, packet_bytes)
 
     def send_login(self):
@@ -0,0 +1,22 @@
+from collections import OrderedDict
+
+class TextCache:
+    """Rendered text Surfaces by (text, color, font), least recently used dropped first.
+
+    Labels and menu lines never change, and scores change a few times a second at
+    most, so almost every lookup is a hit instead of a font rasterization.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._surfs = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (text, color, font)
+        surf = self._surfs.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self._surfs[key] = surf
+            if len(self._surfs) > self.maxsize: self._surfs.popitem(last=False)
+        else:
+            self._surfs.move_to_end(key)
+        return surf
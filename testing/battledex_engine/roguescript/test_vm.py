@@ -8,6 +8,11 @@ Lexer -> Parser -> Compiler -> VM
 import unittest
 from battledex_engine.roguescript.vm import VirtualMachine, InterpretResult
 from battledex_engine.roguescript.errors import RogueScriptRuntimeError
+from battledex_engine.roguescript.lexer import Lexer
+from battledex_engine.roguescript.parser import Parser
+from battledex_engine.roguescript.compiler import Compiler
+from battledex_engine.roguescript.function import to_marshal, from_marshal
+import marshal
 
 class TestVM(unittest.TestCase):
 
@@ -269,6 +274,26 @@ class TestVM(unittest.TestCase):
         self.assertEqual(result, InterpretResult.OK)
         self.assertEqual(value, 55)
 
+    def test_marshal_roundtrip(self):
+        code = """
+        def fib(n) {
+            if (n < 2) {
+                return n;
+            }
+            return fib(n - 1) + fib(n - 2);
+        }
+        
+        fib(10);
+        """
+        program = Parser(Lexer(code).get_all_tokens()).parse()
+        function = Compiler().compile(program)
+        # What `rog compile` writes and `rog run` reads back
+        loaded = from_marshal(marshal.loads(marshal.dumps(to_marshal(function))))
+        self.assertEqual(loaded, function)
+        result, value = self.vm.execute(loaded)
+        self.assertEqual(result, InterpretResult.OK)
+        self.assertEqual(value, 55)
+
 if __name__ == '__main__':
     unittest.main()
 
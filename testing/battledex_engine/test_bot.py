@@ -41,5 +41,19 @@ class TestRogueBot(unittest.TestCase):
         self.assertEqual(result, InterpretResult.OK)
         self.assertGreaterEqual(self.engine.state.score, 0)
 
+    def test_is_occupied_branches(self):
+        # is_occupied must hand RogueScript a value its if() treats as false for an empty cell
+        self.engine.state.grid[39][1] = 1
+        script = """
+        var empty = "unset";
+        var full = "unset";
+        if (is_occupied(0, 39)) { empty = "occupied"; } else { empty = "empty"; }
+        if (is_occupied(1, 39)) { full = "occupied"; } else { full = "empty"; }
+        """
+        result, _ = self.bot.vm.interpret(script)
+        self.assertEqual(result, InterpretResult.OK)
+        self.assertEqual(self.bot.vm.globals["empty"], "empty")
+        self.assertEqual(self.bot.vm.globals["full"], "occupied")
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import time
 from battledex_engine.tetris_engine import TetrisEngine, GRID_WIDTH, TOTAL_HEIGHT, BUFFER_HEIGHT
-from battledex_engine.tetromino import Tetromino
+from battledex_engine.tetromino import Tetromino, SHAPE_ID
+from battledex_engine.state import GameState
 
 class TestTetrisEngine(unittest.TestCase):
     def setUp(self):
@@ -18,11 +19,22 @@ class TestTetrisEngine(unittest.TestCase):
         
         self.assertEqual(len(shapes_seen), 7, "7-bag should provide all 7 unique shapes in one cycle")
 
+    def test_seeded_bag_ignores_garbage(self):
+        other = TetrisEngine(seed=42)
+        other.add_garbage(3)
+        other._process_garbage()
+        self.assertEqual(list(other.bag), list(self.engine.bag))
+        # Dealt order: current piece, then the next queue, then the bag
+        state = self.engine.state
+        dealt = [state.current_piece.shape] + list(state.next_queue) + list(self.engine.bag)
+        for start in range(0, len(dealt), 7):
+            self.assertEqual(sorted(dealt[start:start + 7]), sorted('IJLOSTZ'))
+
     def test_srs_rotation_and_kicks(self):
         # T-Spin positioning test (Simple)
         # Place some blocks to force a kick
-        self.engine.state.grid[TOTAL_HEIGHT-1][0] = 'G'
-        self.engine.state.grid[TOTAL_HEIGHT-1][2] = 'G'
+        self.engine.state.grid[TOTAL_HEIGHT-1][0] = SHAPE_ID['G']
+        self.engine.state.grid[TOTAL_HEIGHT-1][2] = SHAPE_ID['G']
         
         # Manually place a T piece
         self.engine.state.current_piece = Tetromino('T', x=0, y=TOTAL_HEIGHT-2, rotation=0)
@@ -41,13 +53,65 @@ class TestTetrisEngine(unittest.TestCase):
     def test_scoring_and_rhythm(self):
         # Force a beat match by overriding start_time or mocking is_on_beat
         # But let's just test the logic
-        self.engine.state.grid[TOTAL_HEIGHT-1] = ['I'] * GRID_WIDTH
+        self.engine.state.grid[TOTAL_HEIGHT-1] = SHAPE_ID['I']
         self.engine._clear_lines()
         
         self.assertEqual(self.engine.state.lines_cleared, 1)
         # Single line clear score is 100 * level
         self.assertGreaterEqual(self.engine.state.score, 100)
 
+    def test_multi_line_clear_compacts_rows(self):
+        grid = self.engine.state.grid
+        grid[TOTAL_HEIGHT-1] = SHAPE_ID['I']
+        grid[TOTAL_HEIGHT-3] = SHAPE_ID['I']
+        grid[TOTAL_HEIGHT-2][0] = SHAPE_ID['T']
+        grid[TOTAL_HEIGHT-4][5] = SHAPE_ID['S']
+        self.engine.refresh_board()
+        self.engine._clear_lines()
+
+        self.assertEqual(self.engine.state.lines_cleared, 2)
+        # Surviving rows keep their order and settle at the bottom
+        self.assertEqual(grid[TOTAL_HEIGHT-1].tolist(), [SHAPE_ID['T']] + [0] * (GRID_WIDTH - 1))
+        self.assertEqual(grid[TOTAL_HEIGHT-2][5], SHAPE_ID['S'])
+        self.assertFalse(grid[:TOTAL_HEIGHT-2].any())
+        self.assertEqual(self.engine.row_bits[TOTAL_HEIGHT-1], 1)
+        self.assertEqual(self.engine.row_bits[TOTAL_HEIGHT-2], 1 << 5)
+        self.assertFalse(self.engine.row_bits[:TOTAL_HEIGHT-2].any())
+
+    def test_clear_lines_limited_to_touched_rows(self):
+        grid = self.engine.state.grid
+        grid[TOTAL_HEIGHT-2] = SHAPE_ID['I']
+        grid[TOTAL_HEIGHT-1][3] = SHAPE_ID['T']
+        self.engine.refresh_board()
+        self.engine._clear_lines(top=TOTAL_HEIGHT-3, bottom=TOTAL_HEIGHT-2)
+
+        self.assertEqual(self.engine.state.lines_cleared, 1)
+        # The row below the cleared span is left in place
+        self.assertEqual(grid[TOTAL_HEIGHT-1][3], SHAPE_ID['T'])
+        self.assertFalse(grid[:TOTAL_HEIGHT-1].any())
+        self.assertEqual(self.engine.row_bits[TOTAL_HEIGHT-1], 1 << 3)
+
+    def test_bpm_setter_and_beat_window(self):
+        self.engine.bpm = 60.0
+        self.assertEqual(self.engine.state.bpm, 60.0)
+        start = self.engine.start_time
+        on_beat, offset = self.engine.is_on_beat(now=start + 3.05)
+        self.assertTrue(on_beat)
+        self.assertAlmostEqual(offset, 0.05, places=4)
+        on_beat, _ = self.engine.is_on_beat(now=start + 3.5)
+        self.assertFalse(on_beat)
+
+    def test_frame_clock_is_shared_until_end_frame(self):
+        self.engine.bpm = 60.0
+        start = self.engine.start_time
+        self.engine.begin_frame(now=start + 2.5)
+        self.assertAlmostEqual(self.engine.state.current_beat, 2.5)
+        self.assertFalse(self.engine.is_on_beat()[0])
+        self.engine.update()
+        self.assertAlmostEqual(self.engine.state.current_beat, 2.5)
+        self.engine.end_frame()
+        self.assertIsNone(self.engine._frame_now)
+
     def test_garbage_handling(self):
         self.engine.add_garbage(2)
         self.assertEqual(self.engine.state.garbage_queue, 2)
@@ -56,19 +120,58 @@ class TestTetrisEngine(unittest.TestCase):
         self.engine.lock_piece()
         
         # Bottom 2 rows should be garbage
-        self.assertEqual(self.engine.state.grid[TOTAL_HEIGHT-1].count('G'), 9)
-        self.assertEqual(self.engine.state.grid[TOTAL_HEIGHT-2].count('G'), 9)
+        self.assertEqual(self.engine.state.grid[TOTAL_HEIGHT-1].tolist().count(SHAPE_ID['G']), 9)
+        self.assertEqual(self.engine.state.grid[TOTAL_HEIGHT-2].tolist().count(SHAPE_ID['G']), 9)
 
     def test_game_over_topout(self):
         # Fill the entire spawn row in the buffer to guarantee collision
         for x in range(GRID_WIDTH):
-            self.engine.state.grid[BUFFER_HEIGHT - 1][x] = 'G'
-            self.engine.state.grid[BUFFER_HEIGHT - 2][x] = 'G'
+            self.engine.state.grid[BUFFER_HEIGHT - 1][x] = SHAPE_ID['G']
+            self.engine.state.grid[BUFFER_HEIGHT - 2][x] = SHAPE_ID['G']
         
         # Next piece will collide on spawn
         self.engine.spawn_piece()
         self.assertTrue(self.engine.state.game_over)
 
+    def test_local_blocks_match_get_blocks(self):
+        for shape in ('I', 'O', 'T', 'S'):
+            for rotation in range(4):
+                piece = Tetromino(shape, rotation=rotation, x=4, y=7)
+                absolute = [(int(x) + piece.x, int(y) + piece.y) for x, y in piece.local_blocks]
+                self.assertEqual(absolute, piece.get_blocks())
+
+    def test_hard_drop_matches_stepwise_descent(self):
+        self.engine.state.grid[TOTAL_HEIGHT-3][4] = SHAPE_ID['G']
+        self.engine.refresh_board()
+        self.engine.state.current_piece = Tetromino('T', x=3, y=BUFFER_HEIGHT)
+        probe = Tetromino('T', x=3, y=BUFFER_HEIGHT)
+        while not self.engine._check_collision(probe):
+            probe.y += 1
+        expected = [(x, y - 1) for x, y in probe.get_blocks()]
+
+        self.engine.hard_drop()
+        for x, y in expected:
+            self.assertEqual(self.engine.state.grid[y][x], SHAPE_ID['T'])
+
+    def test_hard_drop_under_overhang_stops_below_it(self):
+        # Roof over column 4 with an empty pocket beneath it
+        self.engine.state.grid[TOTAL_HEIGHT-6][4] = SHAPE_ID['G']
+        self.engine.refresh_board()
+        self.assertEqual(self.engine.col_heights[4], TOTAL_HEIGHT-6)
+        self.engine.state.current_piece = Tetromino('I', rotation=1, x=2, y=TOTAL_HEIGHT-5)
+
+        self.engine.hard_drop()
+        self.assertEqual(self.engine.state.grid[TOTAL_HEIGHT-5][4], 0)
+        for y in range(TOTAL_HEIGHT-4, TOTAL_HEIGHT):
+            self.assertEqual(self.engine.state.grid[y][4], SHAPE_ID['I'])
+
+    def test_new_grids_are_independent(self):
+        # Each GameState gets its own writable copy of the empty prototype
+        a, b = GameState(), GameState()
+        a.grid[TOTAL_HEIGHT-1][0] = SHAPE_ID['T']
+        self.assertEqual(b.grid[TOTAL_HEIGHT-1][0], 0)
+        self.assertEqual(a.grid.shape, (TOTAL_HEIGHT, GRID_WIDTH))
+
     def test_soft_drop_infinite(self):
         # This is client side logic mostly, but let's test engine.move(0, 1) behavior
         # Piece starts at BUFFER_HEIGHT - 2 (18)
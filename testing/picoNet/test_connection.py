@@ -10,7 +10,9 @@ from unittest.mock import patch
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-from picoNet.connection import Connection, ConnectionState, PicoSocket
+from picoNet.connection import Connection, ConnectionState, PicoSocket, RING_MASK, RING_SIZE
+from picoNet.packet import unpack_packet
+from picoNet.serializer import deserialize
 
 # A small helper to advance time in tests without waiting
 def advance_time(duration):
@@ -92,7 +94,7 @@ class TestConnection(unittest.TestCase):
         print("Running test_ack_processing...")
         # 1. A sends a packet to B
         self.conn_a.send({'initial_message': 'from A'})
-        self.assertEqual(len(self.conn_a._sent_packets), 1, "Packet should be in A's sent buffer before ACK.")
+        self.assertEqual(self.conn_a._sent_live.bit_count(), 1, "Packet should be in A's sent buffer before ACK.")
 
         # 2. B receives the packet
         self.conn_b.update(0.1)
@@ -107,18 +109,62 @@ class TestConnection(unittest.TestCase):
         advance_time(0.01)
         self.conn_a.update(0.1) # Let A process the incoming packet with the ACK
 
-        self.assertEqual(len(self.conn_a._sent_packets), 0, "Packet should be cleared from A's sent buffer after being ACKed.")
+        self.assertEqual(self.conn_a._sent_live.bit_count(), 0, "Packet should be cleared from A's sent buffer after being ACKed.")
         print("ACK processing successful.")
         
+    def test_ack_bitfield_clears_only_flagged_packets(self):
+        """Tests that each set bit in an ACK bitfield acknowledges ack - 1 - bit."""
+        now = time.monotonic()
+        for seq in (65535, 2, 3, 4, 5):
+            slot = seq & RING_MASK
+            self.conn_a._sent_times[slot] = now
+            self.conn_a._sent_seqs[slot] = seq
+            self.conn_a._sent_live |= 1 << slot
+        # ack=5, bits 0 and 5 -> 4 and 65535 (wrapped)
+        self.conn_a._process_acks(now, 5, 0b100001)
+        self.assertEqual(self.conn_a._sent_live, (1 << 2) | (1 << 3))
+
+    def test_unacked_packets_beyond_ring_size_kept(self):
+        """Tests that sending more than RING_SIZE packets without ACKs keeps every one for resending."""
+        print("Running test_unacked_packets_beyond_ring_size_kept...")
+        count = RING_SIZE + 10
+        for i in range(count):
+            self.conn_a.send({'id': i})
+
+        self.assertEqual(self.conn_a._sent_live.bit_count(), count)
+        live = self.conn_a._sent_live
+        seqs = {self.conn_a._sent_seqs[slot] for slot in range(live.bit_length()) if (live >> slot) & 1}
+        self.assertEqual(seqs, set(range(count)))
+
+        # Acking the oldest packet still finds it after the ring has grown
+        self.conn_a._process_acks(time.monotonic(), 0, 0)
+        self.assertEqual(self.conn_a._sent_live.bit_count(), count - 1)
+        print("No unacked packet was dropped.")
+
+    def test_ack_only_packet_carries_current_ack_state(self):
+        """Tests that the reused ACK-only buffer is patched with the latest ack fields."""
+        sent = []
+        self.conn_a._remote_sequence_number = 300
+        self.conn_a._ack_bitfield = 0b101
+        with patch.object(self.conn_a._socket, 'send', side_effect=lambda addr, data: sent.append(bytes(data))):
+            self.conn_a.send_ack_only()
+            self.conn_a._remote_sequence_number = 301
+            self.conn_a.send_ack_only()
+
+        first, second = (unpack_packet(data) for data in sent)
+        self.assertEqual((first.header.sequence, first.header.ack, first.header.ack_bitfield), (0, 300, 0b101))
+        self.assertEqual(second.header.ack, 301)
+        self.assertEqual(second.payload, b'')
+
     def test_packet_loss_and_resend(self):
         """Tests the packet resend logic by simulating packet loss."""
         print("Running test_packet_loss_and_resend...")
         self.conn_a.rtt = 0.1 # Set a predictable RTT for the test
 
         # Use mock to "lose" the packet by preventing B's socket from receiving it
-        with patch.object(self.conn_b._socket, 'receive', return_value=None):
+        with patch.object(self.conn_b._socket, 'receive_batch_into', return_value=[]):
             self.conn_a.send({'important_data': 'must arrive'})
-            self.assertEqual(len(self.conn_a._sent_packets), 1)
+            self.assertEqual(self.conn_a._sent_live.bit_count(), 1)
 
             # Let enough time pass for a resend to trigger (rtt * 1.5)
             advance_time(0.2)
@@ -131,6 +177,73 @@ class TestConnection(unittest.TestCase):
         self.assertEqual(received[0], {'important_data': 'must arrive'})
         print("Packet loss and resend successful.")
 
+    def test_duplicate_packet_delivered_once(self):
+        """Tests that a packet arriving twice (e.g. a spurious resend) is only delivered once."""
+        self.conn_a.send({'seq_test': 1})
+        slot = self.conn_a._sent_live.bit_length() - 1
+        packed = self.conn_a._sent_data[slot]
+        self.conn_a._socket.send(self.conn_a.remote_address, packed)
+        advance_time(0.01)
+        self.conn_b.update(0.1)
+
+        self.assertEqual(self.conn_b.receive(), [{'seq_test': 1}])
+
+    def test_foreign_protocol_packet_dropped(self):
+        """Tests that a packet with the wrong protocol ID is ignored."""
+        self.conn_a.send({'seq_test': 1})
+        slot = self.conn_a._sent_live.bit_length() - 1
+        foreign = b'XXXX' + self.conn_a._sent_data[slot][4:]
+        advance_time(0.01)
+        self.conn_b._socket.receive_batch_into() # drop the genuine copy
+        self.conn_a._socket.send(self.conn_a.remote_address, foreign)
+        advance_time(0.01)
+        self.conn_b.update(0.1)
+
+        self.assertEqual(self.conn_b.receive(), [])
+
+    def test_undecodable_packet_left_unacked(self):
+        """Tests that a packet whose payload fails to decode isn't acked, so a resend is still accepted."""
+        self.conn_a.send({'seq_test': 1})
+        slot = self.conn_a._sent_live.bit_length() - 1
+        packed = self.conn_a._sent_data[slot]
+        advance_time(0.01)
+        self.conn_b._socket.receive_batch() # drop the genuine copy
+        self.conn_a._socket.send(self.conn_a.remote_address, packed[:12] + b'garbage')
+        advance_time(0.01)
+        self.conn_b.update(0.1)
+
+        self.assertEqual(self.conn_b.receive(), [])
+        self.assertEqual(self.conn_b._remote_sequence_number, -1)
+
+        self.conn_a._socket.send(self.conn_a.remote_address, packed)
+        advance_time(0.01)
+        self.conn_b.update(0.1)
+        self.assertEqual(self.conn_b.receive(), [{'seq_test': 1}])
+
+    def test_duplicate_packet_not_decoded(self):
+        """Tests that a duplicate is dropped before its payload is decoded again."""
+        self.conn_a.send({'seq_test': 1})
+        slot = self.conn_a._sent_live.bit_length() - 1
+        self.conn_a._socket.send(self.conn_a.remote_address, self.conn_a._sent_data[slot])
+        advance_time(0.01)
+        with patch('picoNet.connection.deserialize', wraps=deserialize) as decode:
+            self.conn_b.update(0.1)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(self.conn_b.receive(), [{'seq_test': 1}])
+
+    def test_resend_scan_skipped_until_due(self):
+        """Tests that update() only scans for lost packets once the oldest one is overdue."""
+        self.conn_a.rtt = 0.1
+        with patch.object(Connection, '_resend_lost_packets') as scan:
+            self.conn_a.update(0.0)
+            self.conn_a.send({'pending': True})
+            self.conn_a.update(0.0)
+            scan.assert_not_called()
+            advance_time(0.2)
+            self.conn_a.update(0.2)
+            scan.assert_called_once()
+
     def test_connection_timeout(self):
         """Tests that the connection times out if no packets are received."""
         print("Running test_connection_timeout...")
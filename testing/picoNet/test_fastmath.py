@@ -0,0 +1,42 @@
+"""
+testing/picoNet/test_fastmath.py
+
+Unit tests for the picoNet._fastmath module.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the root project directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
+
+from picoNet._fastmath import is_sequence_greater, update_ack_bitfield
+
+class TestFastMath(unittest.TestCase):
+    """
+    Test suite for sequence comparison and ACK bitfield updates.
+    """
+
+    def test_sequence_comparison_wraps(self):
+        """Tests that comparison treats 0 as newer than 65535."""
+        self.assertTrue(is_sequence_greater(5, 3))
+        self.assertFalse(is_sequence_greater(3, 5))
+        self.assertTrue(is_sequence_greater(0, 65535))
+        self.assertFalse(is_sequence_greater(65535, 0))
+
+    def test_update_ack_bitfield(self):
+        """Tests the first packet, newer packets and late arrivals."""
+        # First packet only sets the remote sequence
+        self.assertEqual(update_ack_bitfield(-1, 0, 7), (7, 0))
+        # Newer by 2: previous remote becomes bit 1
+        self.assertEqual(update_ack_bitfield(7, 0, 9), (9, 0b10))
+        # Late arrival fills in its bit without moving the remote sequence
+        self.assertEqual(update_ack_bitfield(9, 0b10, 8), (9, 0b11))
+        # A jump past the window clears the bitfield
+        self.assertEqual(update_ack_bitfield(9, 0b11, 40), (40, 0))
+        # Wraps around 65535
+        self.assertEqual(update_ack_bitfield(65535, 0, 0), (0, 0b1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,7 +12,10 @@ import os
 # This allows us to import modules from the picoNet library
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 
-from picoNet.packet import Packet, PacketHeader, pack_packet, unpack_packet
+import zlib
+
+from picoNet.packet import (Packet, PacketHeader, pack_packet, unpack_packet, pack_batch, unpack_batch,
+                            MAX_BATCH)
 
 class TestPacket(unittest.TestCase):
     """
@@ -64,6 +67,79 @@ class TestPacket(unittest.TestCase):
 
         print("ValueError was correctly raised for small packet.")
 
+    def test_unpack_payload_is_a_view(self):
+        """
+        Tests that the unpacked payload references the received buffer
+        instead of copying it.
+        """
+        print("\nRunning test_unpack_payload_is_a_view...")
+        data = bytearray(pack_packet(Packet(PacketHeader(), b'abc')))
+        packet = unpack_packet(data)
+
+        self.assertIsInstance(packet.payload, memoryview)
+        data[-1] = ord('z')
+        self.assertEqual(bytes(packet.payload), b'abz')
+        print("Payload is a view into the received data.")
+
+    def test_batch_roundtrip(self):
+        """
+        Tests that several payloads packed behind one header come back out
+        of the packet in order.
+        """
+        print("\nRunning test_batch_roundtrip...")
+        header = PacketHeader(sequence=7)
+        payloads = [b'first', b'', b'third message']
+
+        packet = unpack_packet(pack_batch(header, payloads))
+        self.assertEqual(packet.header, header)
+        self.assertEqual(unpack_batch(packet.payload), payloads)
+        print("Batched payloads were recovered.")
+
+    def test_compressed_batch_roundtrip(self):
+        """
+        Tests that a zlib-compressed batch body is unpacked when flagged, and
+        that garbage in a flagged body raises a ValueError.
+        """
+        print("\nRunning test_compressed_batch_roundtrip...")
+        payloads = [b'\x00' * 300, b'grid']
+        body = unpack_packet(pack_batch(PacketHeader(), payloads)).payload
+
+        self.assertEqual(unpack_batch(zlib.compress(body), True), payloads)
+        with self.assertRaises(ValueError):
+            unpack_batch(b'not zlib', True)
+        print("Compressed batch was recovered.")
+
+    def test_oversized_compressed_batch_rejected(self):
+        """
+        Tests that a small compressed body which inflates past MAX_BATCH, or
+        one cut short or followed by junk, raises a ValueError.
+        """
+        print("\nRunning test_oversized_compressed_batch_rejected...")
+        bomb = zlib.compress(b'\x00' * (MAX_BATCH * 100))
+        self.assertLess(len(bomb), MAX_BATCH)
+
+        with self.assertRaises(ValueError):
+            unpack_batch(bomb, True)
+        with self.assertRaises(ValueError):
+            unpack_batch(zlib.compress(b'\x00' * 300)[:-4], True)
+        with self.assertRaises(ValueError):
+            unpack_batch(zlib.compress(b'\x00\x01x') + b'junk', True)
+        print("ValueError was correctly raised for an oversized batch.")
+
+    def test_unpack_truncated_batch(self):
+        """
+        Tests that unpack_batch raises a ValueError when a message is cut short.
+        """
+        print("\nRunning test_unpack_truncated_batch...")
+        packet = unpack_packet(pack_batch(PacketHeader(), [b'complete', b'cut short']))
+
+        with self.assertRaises(ValueError):
+            unpack_batch(packet.payload[:-3])
+        with self.assertRaises(ValueError):
+            unpack_batch(b'\x00')
+
+        print("ValueError was correctly raised for a truncated batch.")
+
 if __name__ == '__main__':
     unittest.main()
 def remote_test():
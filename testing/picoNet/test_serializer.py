@@ -106,6 +106,108 @@ class TestSerializer(unittest.TestCase):
                          "Should correctly handle a mix of known and unknown keys.")
         print("Successfully serialized and deserialized a mix of known and unknown keys.")
 
+    def test_serialize_appends_to_given_buffer(self):
+        """
+        Tests that passing a buffer appends the encoding to it rather than
+        starting a fresh one.
+        """
+        print("\nRunning test_serialize_appends_to_given_buffer...")
+        buf = bytearray(b'\xAA')
+        encoded = serializer.serialize(self.game_command_data, buf)
+
+        self.assertEqual(encoded, bytes(buf))
+        self.assertEqual(encoded[1:], serializer.serialize(self.game_command_data))
+        self.assertEqual(serializer.deserialize(encoded[1:]), self.game_command_data)
+        print("Encoding was appended to the caller's buffer.")
+
+    def test_serialize_into_rewrites_after_offset(self):
+        """
+        Tests that serialize_into keeps the bytes before the offset, replaces
+        everything after it, and returns the end of the encoding.
+        """
+        print("\nRunning test_serialize_into_rewrites_after_offset...")
+        buf = bytearray(b'HDR')
+        serializer.serialize_into({'command': 'a much longer first payload'}, buf, 3)
+        end = serializer.serialize_into({'tick': 7}, buf, 3)
+
+        self.assertEqual(end, len(buf))
+        self.assertEqual(bytes(buf[:3]), b'HDR')
+        self.assertEqual(serializer.deserialize(bytes(buf[3:end])), {'tick': 7})
+        print("Payload was rewritten behind the header.")
+
+
+    def test_nested_dicts_followed_by_siblings(self):
+        """
+        Tests that values after a nested dictionary (in the same list or the
+        enclosing dictionary) are read back correctly, from a memoryview too.
+        """
+        print("\nRunning test_nested_dicts_followed_by_siblings...")
+        data = {'items': [{'x': 1}, {'y': {'z': 2.5}}, 'after'], 'tick': 3}
+        encoded = serializer.serialize(data)
+
+        self.assertEqual(serializer.deserialize(encoded), data)
+        self.assertEqual(serializer.deserialize(memoryview(encoded)), data)
+        print("Siblings of nested dictionaries survived the round trip.")
+
+    def test_deserialize_truncated_data(self):
+        """
+        Tests that every truncation of a valid payload raises a ValueError.
+        """
+        print("\nRunning test_deserialize_truncated_data...")
+        encoded = serializer.serialize(self.game_command_data)
+        for end in range(1, len(encoded)):
+            with self.assertRaises(ValueError):
+                serializer.deserialize(encoded[:end])
+        print("ValueError was raised for every truncation.")
+
+    def test_int_widths(self):
+        """
+        Tests that ints round-trip at every width boundary and that small
+        ints take the narrow encodings.
+        """
+        print("\nRunning test_int_widths...")
+        values = [0, 1, -1, 127, -128, 128, -129, 32767, -32768, 32768,
+                  2**31 - 1, -2**31, 2**31, -2**31 - 1, 2**63 - 1, -2**63]
+        data = {'values': values}
+        self.assertEqual(serializer.deserialize(serializer.serialize(data)), data)
+
+        # Dict header (3) + known key (2) + tagged value
+        self.assertEqual(len(serializer.serialize({'tick': 5})), 7)
+        self.assertEqual(len(serializer.serialize({'tick': 300})), 8)
+        self.assertEqual(len(serializer.serialize({'tick': 70000})), 10)
+        self.assertEqual(len(serializer.serialize({'tick': 2**40})), 14)
+        print("Ints round-tripped at every width.")
+
+    def test_bytes_roundtrip(self):
+        """
+        Tests that raw bytes (and other buffers) are carried as a single
+        length-prefixed blob and come back as bytes.
+        """
+        print("\nRunning test_bytes_roundtrip...")
+        grid = bytes(range(200))
+        data = {'grid': grid, 'empty': b'', 'view': memoryview(b'abc')}
+
+        result = serializer.deserialize(serializer.serialize(data))
+        self.assertEqual(result, {'grid': grid, 'empty': b'', 'view': b'abc'})
+        self.assertIsInstance(result['view'], bytes)
+        # Dict header (3) + unknown key (3 + 4) + tag and length (3) + blob
+        self.assertEqual(len(serializer.serialize({'blob': grid})), 13 + len(grid))
+        print("Bytes round-tripped as a blob.")
+
+    def test_known_values_are_interned(self):
+        """
+        Tests that codebook keys and command names encode as single-byte IDs
+        and still round-trip.
+        """
+        print("\nRunning test_known_values_are_interned...")
+        data = {'command': 'opponent_update', 'score': 12, 'lines': 2}
+        encoded = serializer.serialize(data)
+
+        self.assertEqual(serializer.deserialize(encoded), data)
+        # Dict header (3) + three known keys (2 each) + known string (2) + two int8s (2 each)
+        self.assertEqual(len(encoded), 15)
+        print("Known keys and values were interned.")
+
 
 if __name__ == '__main__':
     unittest.main()
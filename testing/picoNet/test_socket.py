@@ -8,6 +8,7 @@ import unittest
 import sys
 import os
 import time
+import selectors
 
 # Add the root project directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
@@ -70,6 +71,44 @@ class TestPicoSocket(unittest.TestCase):
         self.assertEqual(from_address, address_a, "The sender address is incorrect.")
         print("Send/Receive successful.")
 
+    def test_receive_batch_into_views_arena(self):
+        """
+        Tests that receive_batch_into returns views of each datagram in order.
+        """
+        address_b = self.socket_b.socket.getsockname()
+        self.socket_a.send_batch(address_b, [b'first', b'second'])
+        time.sleep(0.01)
+
+        batch = self.socket_b.receive_batch_into(8)
+        self.assertEqual([bytes(data) for data, _ in batch], [b'first', b'second'])
+        self.assertTrue(all(isinstance(data, memoryview) for data, _ in batch))
+
+    def test_send_batch_preserves_order(self):
+        """
+        Tests that send_batch delivers every datagram in order.
+        """
+        address_b = self.socket_b.socket.getsockname()
+        self.socket_a.send_batch(address_b, [b'one', b'two', b'three'])
+        time.sleep(0.01)
+
+        received = [data for data, _ in self.socket_b.receive_batch(8)]
+        self.assertEqual(received, [b'one', b'two', b'three'])
+
+    def test_receive_batch_respects_cap(self):
+        """
+        Tests that receive_batch drains several datagrams but no more than max_n.
+        """
+        address_b = self.socket_b.socket.getsockname()
+        for i in range(5):
+            self.socket_a.send(address_b, bytes([i]))
+        time.sleep(0.01)
+
+        first = self.socket_b.receive_batch(3)
+        rest = self.socket_b.receive_batch(3)
+        self.assertEqual([data for data, _ in first], [b'\x00', b'\x01', b'\x02'])
+        self.assertEqual([data for data, _ in rest], [b'\x03', b'\x04'])
+        self.assertEqual(self.socket_b.receive_batch(3), [])
+
     def test_receive_non_blocking(self):
         """
         Tests that receive() returns None immediately when no data is available,
@@ -83,6 +122,22 @@ class TestPicoSocket(unittest.TestCase):
         self.assertIsNone(received, "receive() should return None when no data is available.")
         print("Non-blocking receive works as expected.")
 
+    def test_selector_wakes_on_datagram(self):
+        """
+        Tests that a PicoSocket can be registered with a selector directly and
+        reports readable only once a datagram is waiting.
+        """
+        print("Running test_selector_wakes_on_datagram...")
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket_b, selectors.EVENT_READ)
+        try:
+            self.assertEqual(selector.select(0), [])
+            self.socket_a.send(self.socket_b.socket.getsockname(), b'ping')
+            self.assertEqual(len(selector.select(1.0)), 1)
+        finally:
+            selector.close()
+        print("Selector woke on the datagram.")
+
 if __name__ == '__main__':
     unittest.main()
 def remote_test():
@@ -0,0 +1,44 @@
+"""
+testing/roguedex_client/test_decode_grid.py
+
+Unit tests for decoding opponent grids received from the server.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the root project directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
+
+import numpy as np
+
+from battledex_engine.state import GRID_WIDTH, GRID_HEIGHT
+from roguedex_client.main import decode_grid
+
+class TestDecodeGrid(unittest.TestCase):
+    """
+    Test suite for decode_grid.
+    """
+
+    def test_full_grid_decoded(self):
+        """
+        Tests that a blob of exactly one visible board comes back as a
+        GRID_HEIGHT x GRID_WIDTH array.
+        """
+        grid = np.arange(GRID_WIDTH * GRID_HEIGHT, dtype=np.uint8) % 8
+        decoded = decode_grid(grid.tobytes())
+        self.assertEqual(decoded.shape, (GRID_HEIGHT, GRID_WIDTH))
+        self.assertEqual(decoded.tobytes(), grid.tobytes())
+
+    def test_truncated_grid_dropped(self):
+        """
+        Tests that a blob of the wrong length is dropped instead of raising.
+        """
+        blob = bytes(GRID_WIDTH * GRID_HEIGHT)
+        self.assertEqual(decode_grid(blob[:-3]), [])
+        self.assertEqual(decode_grid(blob[:-GRID_WIDTH]), [])
+        self.assertEqual(decode_grid(blob + b'\x01'), [])
+
+if __name__ == '__main__':
+    unittest.main()
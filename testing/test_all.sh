@@ -2,4 +2,5 @@
 cd ..
 python3 -m unittest discover testing/battledex_engine
 python3 -m unittest discover testing/picoNet
+python3 -m unittest discover testing/roguedex_client
 python3 -m unittest discover testing/rotomdex